@@ -4,27 +4,1949 @@ pywinsnake - WinSnake game
 
 github: AzzamMuhyala - https://github.com/azzammuhyala
 """
-import os, random, time, math
-if os.name == 'nt':
-    try:
-        from asciiTUI import terminal_size as tsize
-        from asciiTUI import remove_ansi as rmansi
-        from asciiTUI import rgb, justify
+import os, sys, random, time, math, itertools, json, tempfile, queue, select, threading, struct, zlib, asyncio
+from array import array
+from multiprocessing import shared_memory
+from collections import Counter, deque
+from typing import NamedTuple
+try:
+    import numpy as np # optional, only needed by SnakeBatch
+except ImportError:
+    np = None
+# The game engine (SnakeEngine) only needs the standard library, the terminal frontend (Snake) needs the packages below
+_frontend_error = None
+try:
+    from asciiTUI import terminal_size as tsize
+    from asciiTUI import remove_ansi as rmansi
+    from asciiTUI import rgb, justify
+    if os.name == 'nt':
+        import keyboard
         from keyboard import is_pressed as ispress
         from msvcrt import getch
-    except Exception as e:
-        type_error = type(e).__name__
+except Exception as e:
+    _frontend_error = e
+if os.name != 'nt':
+    import termios, tty
+
+    def getch() -> bytes:
+        # reads one key press from the terminal without waiting for enter, like msvcrt.getch()
+        fd = sys.stdin.fileno()
+        attrs = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            return os.read(fd, 1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, attrs)
+
+def _frontendError(windows:bool=True) -> None|tuple[int, str]:
+    # returns the exit code and error message if the terminal frontend can't run in this environment,
+    # `windows` is True when the input type needs the `keyboard` and `msvcrt` modules
+    if _frontend_error is not None:
+        type_error = type(_frontend_error).__name__
         if type_error == 'ModuleNotFoundError':
-            print(f'Please install packages:\n  asciiTUI `pip install asciiTUI`\n  keyboard `pip install keyboard`\n{type_error}: {e}')
+            return -2, f'Please install packages:\n  asciiTUI `pip install asciiTUI`\n  keyboard `pip install keyboard`\n{type_error}: {_frontend_error}'
+        return -2, f'WinSnake ERROR: \033[31m{type_error}\033[0m: {_frontend_error}'
+    if windows and os.name != 'nt':
+        return -1, '\033[31mERROR\033[0m - THIS SOFTWARE ONLY WORKS IN A WINDOWS ENVIRONMENT'
+    return None
+
+def _clearScreen() -> None:
+    # clears the terminal with the command of the OS
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+def _checkBoardArgs(width:int, height:int, lots_of_apples:int, len_snake:int, show_score_board:bool) -> None:
+    # checks the type and the limits of the snake board arguments
+    if not all(isinstance(args, int) for args in (width, height, lots_of_apples, len_snake)):
+        raise TypeError('Type arguments (width:{}, height:{}, lots_of_apples:{}, len_snake:{}) are all not int'.format(
+            type(width).__name__, type(height).__name__, type(lots_of_apples).__name__, type(len_snake).__name__
+        ))
+    maxradius = (width-2) * (height-(4 if show_score_board else 3)) - 10
+    if (258 < width) or (width < 50) or (128 < height) or (height < 15) or (maxradius < lots_of_apples) or (lots_of_apples < 1) or (maxradius < len_snake) or (len_snake < 1):
+        raise ValueError(f'The value given is out of bounds.\nMIN, MAX:\n  width: 50, 258 - [got {width}]\n  height: 15, 128 - [got {height}]\n  lots_of_apples: 1, {maxradius} - [got {lots_of_apples}]\n  len_snake: 1, {maxradius} - [got {len_snake}]')
+
+def _wrapOffset(a:int, b:int, size:int, wrap:bool) -> int:
+    # Shortest signed offset from a to b on an axis of `size` cells, around the edges if wrap is True
+    offset = b - a
+    if wrap and abs(offset) > size/2:
+        offset -= size if offset > 0 else -size
+    return offset
+
+class SnakeState(NamedTuple):
+    """ The state of the game returned by SnakeEngine.step() and SnakeEngine.reset() """
+    head: tuple[int]
+    move: str
+    length: int
+    score: int
+    apples: int
+    tick: int
+
+class AppleIndex:
+    """
+Apple coordinates sorted into buckets of about `bucket` x `bucket` cells for nearest apple queries. The buckets
+around the query are searched ring by ring until no closer apple can be found, so a query only looks at the
+apples near it and takes about the same time with 200 or 20000 apples (a few apples are simply all compared).
+Distances are Manhattan distances (the snake moves one cell up, down, left or right), around the edges of the
+board if `wrap` is True.
+
+>>> index = AppleIndex(80, 22, wrap=True)
+>>> index.add((10, 5))
+>>> index.nearest((75, 5))        # (10, 5), 15 cells away around the edge
+>>> index.k_nearest((75, 5), 3)   # the 3 nearest apples, the nearest first
+    """
+    def __init__(self, width:int, rows:int, wrap:bool, bucket:int=8) -> None:
+        self.WIDTH = width # width of the board
+        self.ROWS = rows # rows of the board
+        self.WRAP = bool(wrap) # the distances go around the edges of the board if the value is True
+        self.BUCKET = max(1, min(bucket, width, rows)) # the largest width and height of a bucket in cells
+        self._columns = -(-width // self.BUCKET) # buckets in a row, the board is split evenly so the buckets differ by one cell at most
+        self._bucketRows = -(-rows // self.BUCKET)
+        self._minSize = min(width // self._columns, rows // self._bucketRows) # the smallest width or height of a bucket
+        self._buckets = [set() for _ in range(self._columns * self._bucketRows)] # apple coordinates in each bucket
+        self._apples = set() # all apple coordinates
+
+    def __len__(self) -> int:
+        return len(self._apples)
+
+    def __contains__(self, pos:tuple[int]) -> bool:
+        return pos in self._apples
+
+    def _bucket(self, pos:tuple[int]) -> set:
+        # the bucket of the coordinates
+        return self._buckets[pos[1] * self._bucketRows // self.ROWS * self._columns + pos[0] * self._columns // self.WIDTH]
+
+    def add(self, pos:tuple[int]) -> None:
+        """ Adds apple coordinates, coordinates already in the index are kept once """
+        if pos not in self._apples:
+            self._apples.add(pos)
+            self._bucket(pos).add(pos)
+
+    def remove(self, pos:tuple[int]) -> None:
+        """ Removes apple coordinates if they are in the index """
+        if pos in self._apples:
+            self._apples.remove(pos)
+            self._bucket(pos).remove(pos)
+
+    def clear(self) -> None:
+        """ Removes all apples """
+        for bucket in self._buckets:
+            bucket.clear()
+        self._apples.clear()
+
+    def distance(self, a:tuple[int], b:tuple[int]) -> int:
+        """ Returns the Manhattan distance of two coordinates, around the edges with `wrap` """
+        return abs(_wrapOffset(a[0], b[0], self.WIDTH, self.WRAP)) + abs(_wrapOffset(a[1], b[1], self.ROWS, self.WRAP))
+
+    def nearest(self, pos:tuple[int]) -> None|tuple[int]:
+        """ Returns the coordinates of the nearest apple, None if there are no apples """
+        nearest = self.k_nearest(pos, 1)
+        return nearest[0] if nearest else None
+
+    def k_nearest(self, pos:tuple[int], k:int) -> list[tuple[int]]:
+        """ Returns the coordinates of the `k` nearest apples, the nearest first (equal distances by coordinates) """
+        if not self._apples or k < 1:
+            return []
+        W, R, wrap = self.WIDTH, self.ROWS, self.WRAP
+        px, py = pos
+        def distances(apples) -> list[tuple[int, tuple[int]]]:
+            # (distance, coordinates) of the apples, the same as self.distance()
+            found = []
+            for apple in apples:
+                dx, dy = apple[0]-px, apple[1]-py
+                if dx < 0: dx = -dx
+                if dy < 0: dy = -dy
+                if wrap:
+                    if dx > W-dx: dx = W-dx
+                    if dy > R-dy: dy = R-dy
+                found.append((dx+dy, apple))
+            return found
+        if len(self._apples) <= 32:
+            return [apple for _, apple in sorted(distances(self._apples))[:k]]
+        B, columns, bucketRows, buckets = self._minSize, self._columns, self._bucketRows, self._buckets
+        bx, by = px * columns // W, py * bucketRows // R
+        found = [] # (distance, coordinates)
+        seen = set() # buckets searched already, a ring around the edges can reach them again
+        for ring in range(max(columns, bucketRows) + 1):
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                # every apple in this ring or further is at least this far away
+                if (ring-1)*B + 1 > found[-1][0]:
+                    break
+            if ring:
+                ringBuckets = ([(x, by-ring) for x in range(bx-ring, bx+ring+1)] + [(x, by+ring) for x in range(bx-ring, bx+ring+1)]
+                              +[(bx-ring, y) for y in range(by-ring+1, by+ring)] + [(bx+ring, y) for y in range(by-ring+1, by+ring)])
+            else:
+                ringBuckets = [(bx, by)]
+            for x, y in ringBuckets:
+                if wrap:
+                    i = y % bucketRows * columns + x % columns
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                elif 0 <= x < columns and 0 <= y < bucketRows:
+                    i = y*columns + x
+                else:
+                    continue
+                if buckets[i]:
+                    found.extend(distances(buckets[i]))
+        found.sort()
+        return [apple for _, apple in found[:k]]
+
+class SnakeEngine:
+    """
+Headless snake game simulation without terminal, keyboard or sleep.
+
+>>> engine = SnakeEngine(seed=1)
+>>> state, reward, done = engine.step('d')
+
+`step(action)` advances the game by one tick. `action` is one of 'w', 'a', 's', 'd' to
+change the direction, '' to stop the snake or None to keep the current direction. It returns
+the new SnakeState, the number of apples eaten in the tick and whether the game is over.
+`reset(seed)` starts a new game, the game is only over in `game_over` mode.
+
+The parameters are the same as in Snake(). `bot_action()` returns the next action of the
+`bot_move_type` bot and `nearest_apples(k)` the k apples nearest to the snake head.
+
+`snapshot()` starts an undo log of every change made by step() and returns a snapshot, `undo(snapshot)`
+goes back to it. Both cost nothing more when the snake is longer, the undo only costs the changes made
+after the snapshot. reset() ends the undo log.
+
+>>> snapshot = engine.snapshot()
+>>> engine.step('w')
+>>> engine.undo(snapshot)
+    """
+    __slots__ = ('WIDTH', 'HEIGHT', 'LOA', 'LS', 'GNA', 'SPA', 'GO', 'SSB', 'BMT', 'BTL', 'SEED', '_random', '_deltaMove', '_dirtyCells',
+                 '_snakeGrid', '_snakeList', '_posApples', '_appleIndex', '_freeCells', '_freePos', '_botNeighbours', '_botRandom', '_profiler',
+                 '_undoLog', '_undoMark', '_undoRandom', '_undoRandomPos', '_game_over', '_gameOverMessage', '_tick', '_posX_snake',
+                 '_posY_snake', '_deltaX', '_deltaY', '_moveSnake', '_lenSnake', '_rmCountApple')
+
+    def __init__(self,
+                width             :int  = 80,
+                height            :int  = 24,
+                lots_of_apples    :int  = 20,
+                len_snake         :int  = 1,
+                generate_new_apple:bool = True,
+                set_pos_apple     :bool = False,
+                game_over         :bool = True,
+                show_score_board  :bool = True,
+                bot_move_type     :str  = 'neat',
+                bot_time_limit    :float = 0.005,
+                seed              :None|int = None
+        ) -> None:
+        _checkBoardArgs(width, height, lots_of_apples, len_snake, show_score_board)
+        if not bot_move_type in ('neat', 'algorithm', 'pathfinding', 'mcts'):
+            raise TypeError(f"No bot mode with type '{bot_move_type}'!")
+        if not isinstance(bot_time_limit, (int, float)):
+            raise TypeError(f'Type argument bot_time_limit:{type(bot_time_limit).__name__} is not float')
+        if bot_time_limit <= 0:
+            raise ValueError(f'The value given is out of bounds.\nMIN:\n  bot_time_limit: more than 0 - [got {bot_time_limit}]')
+
+        self.WIDTH = width # width of display
+        self.HEIGHT = height # height of display
+        self.LOA = lots_of_apples # the number of apples in the game
+        self.LS = len_snake # snake length for the first time
+        self.GNA = bool(generate_new_apple) # produces a new apple every time you eat one if the value is True
+        self.SPA = bool(set_pos_apple) # adjusts the alignment of the apple's position if the value is True
+        self.GO = bool(game_over) # showing game over if the value is True
+        self.SSB = bool(show_score_board) # display scoreboard setting
+        self.BMT = bot_move_type # types bot moving
+        self.BTL = bot_time_limit # maximum seconds of a bot decision
+        self.SEED = seed # seed of the random generator
+
+        self._random = random.Random(seed) # random generator of the apple coordinates
+        self._deltaMove = {'w': (0, -1), 'a': (-1, 0), 's': (0, 1), 'd': (1, 0), '': (0, 0)}
+        self._dirtyCells = set() # board cells that changed since the frontend last drew them
+        self._snakeGrid = array('I', [0]) * (self.WIDTH * (self.HEIGHT-self._SSBs(2, 1))) # how many body parts are in each board cell
+        self._snakeList = deque() # snake body from the tail (index 0) to the head (index -1)
+        self._posApples = Counter() # apple coordinates and how many apples are stacked on them
+        rows = self.HEIGHT-self._SSBs(2, 1)
+        self._appleIndex = AppleIndex(self.WIDTH, rows, wrap=not self.GO, bucket=min(32, max(2, 2*math.isqrt(self.WIDTH*rows // self.LOA)))) # nearest apple queries of the bots
+        self._freeCells = array('i') # cells inside the border without snake and apple (set_pos_apple mode)
+        self._freePos = array('i') # index of each cell in self._freeCells, -1 if the cell isn't free
+        self._botNeighbours = None # actions and next cells of every board cell, made by the 'pathfinding' and 'mcts' bots
+        self._botRandom = random.Random(seed) # random generator of the 'mcts' bot rollouts
+        self._profiler = None # FrameProfiler that times the phases of step()
+        # undo log section, see snapshot()
+        self._undoLog = None # changes made by step() since the first snapshot, None if there is no snapshot
+        self._undoMark = 0 # the last snapshot
+        self._undoRandom = True # undo() also goes back to the state of the random generator
+        self._undoRandomPos = -1 # position of the last random generator state in the undo log
+        self._setStart()
+        self._rdmPosApples()
+        if self.BMT in ('pathfinding', 'mcts'):
+            self._botNeighbourCells()
+
+    def _SSBs(self, SSB_T, SSB_F) -> object:
+        # this function is used to set the size of the coordinates which can change depending on the value of self.SSB
+        return SSB_T if self.SSB else SSB_F
+
+    def _setStart(self) -> None:
+        # sets all game values to the start of a game, the apples are generated separately
+        self._game_over = False # Declares whether it is game over or not
+        self._gameOverMessage = '' # the reason of the game over
+        self._tick = 0 # how many ticks have been played in this game
+        # snake position
+        self._posX_snake = (self.WIDTH-2) // 2
+        self._posY_snake = (self.HEIGHT-self._SSBs(4, 3)) // 2
+        # change of snake coordinates
+        self._deltaX = 0
+        self._deltaY = 0
+        self._moveSnake = '' # the direction the snake walks
+        # data section snake coordinates, snake length, and apples
+        self._snakeList.clear()
+        self._snakeGrid = array('I', [0]) * len(self._snakeGrid)
+        self._lenSnake = self.LS
+        self._rmCountApple = 0
+        self._posApples.clear()
+        self._appleIndex.clear()
+        self._dirtyCells.clear()
+        self._undoLog = None # the snapshots of the previous game can't be used anymore
+        if self.SPA:
+            self._freeReset()
+
+    def reset(self, seed:None|int=None) -> SnakeState:
+        """ Starts a new game, the random generator is seeded again if `seed` is given """
+        if seed is not None:
+            self.SEED = seed
+            self._random.seed(seed)
+        self._setStart()
+        self._rdmPosApples()
+        return self.state()
+
+    def state(self) -> SnakeState:
+        """ Returns the current state of the game """
+        return SnakeState((self._posX_snake, self._posY_snake), self._moveSnake, self._lenSnake, self._lenSnake-1, len(self._posApples), self._tick)
+
+    def nearest_apples(self, k:int=1) -> list[tuple[int]]:
+        """ Returns the coordinates of the `k` apples nearest to the snake head in snake moves (see AppleIndex), the nearest first """
+        return self._appleIndex.k_nearest((self._posX_snake, self._posY_snake), k)
+
+    def snapshot(self, random_state:bool=True) -> int:
+        """ Returns a snapshot of the game for undo(), without `random_state` undo() keeps the random generator as it is """
+        if self._undoLog is None:
+            self._undoLog = []
+            self._undoRandomPos = -1
+        self._undoMark = len(self._undoLog)
+        self._undoRandom = random_state
+        return self._undoMark
+
+    def undo(self, snapshot:int) -> None:
+        """ Goes back to the snapshot, the snapshots made after it can't be used anymore """
+        log = self._undoLog
+        if log is None or snapshot > len(log):
+            raise ValueError(f'The snapshot {snapshot} can\'t be used anymore')
+        W = self.WIDTH
+        grid, body, apples, free, freePos = self._snakeGrid, self._snakeList, self._posApples, self._freeCells, self._freePos
+        while len(log) > snapshot:
+            change = log.pop()
+            match change[0]:
+                case 0:
+                    # the values of the snake before the tick
+                    (self._moveSnake, self._deltaX, self._deltaY, self._game_over, self._gameOverMessage, self._tick,
+                     self._posX_snake, self._posY_snake, self._lenSnake, self._rmCountApple) = change[1]
+                case 1:
+                    # the apples on a cell
+                    _, pos, count = change
+                    if count:
+                        apples[pos] = count
+                        self._appleIndex.add(pos)
+                    else:
+                        apples.pop(pos, None)
+                        self._appleIndex.remove(pos)
+                    self._dirtyCells.add(pos)
+                case 2:
+                    change[1].setstate(change[2])
+                case 3:
+                    # a cell added to the free cell index
+                    freePos[free.pop()] = -1
+                case 4:
+                    # a cell removed from the free cell index at index i
+                    _, cell, i = change
+                    if i < len(free):
+                        last = free[i]
+                        freePos[last] = len(free)
+                        free.append(last)
+                        free[i] = cell
+                    else:
+                        free.append(cell)
+                    freePos[cell] = i
+                case 5:
+                    # the new head
+                    x, y = body.pop()
+                    grid[y*W+x] -= 1
+                    self._dirtyCells.add((x, y))
+                case 6:
+                    # the removed tail
+                    body.appendleft(change[1])
+                    grid[change[1][1]*W+change[1][0]] += 1
+                    self._dirtyCells.add(change[1])
+        self._undoMark = min(self._undoMark, snapshot)
+        if self._undoRandomPos >= len(log):
+            self._undoRandomPos = -1
+
+    def release(self) -> None:
+        """ Ends the undo log, the snapshots can't be used anymore """
+        self._undoLog = None
+
+    def _rdmPosApples(self, generated=True) -> None:
+        # This function is used to provide random coordinates of where the apple is located
+        log = self._undoLog
+        if log is not None and self._undoRandom and self._undoRandomPos < self._undoMark:
+            # the random generator state is saved once after every snapshot
+            self._undoRandomPos = len(log)
+            log.append((2, self._random, self._random.getstate()))
+        if self.SPA:
+            # take random cells from the free cell index, so apples are never on the snake or on another apple
+            for _ in range(self.LOA if generated else 1):
+                if not self._freeCells:
+                    break # the board is full, no apple can be placed anymore
+                cell = self._freeCells[self._random.randrange(len(self._freeCells))]
+                self._freeRemove(cell)
+                a = (cell % self.WIDTH, cell // self.WIDTH)
+                self._dirtyCells.add(a)
+                if log is not None:
+                    log.append((1, a, self._posApples[a]))
+                self._posApples[a] += 1
+                self._appleIndex.add(a)
+        elif not self.SPA:
+            rdmpos = lambda: (self._random.randint(1, self.WIDTH-2), self._random.randint(1, self.HEIGHT-self._SSBs(4, 3)))
+            if generated:
+                for _ in range(self.LOA):
+                    a = rdmpos()
+                    self._dirtyCells.add(a)
+                    self._posApples[a] += 1
+                    self._appleIndex.add(a)
+            else:
+                a = rdmpos()
+                self._dirtyCells.add(a)
+                if log is not None:
+                    log.append((1, a, self._posApples[a]))
+                self._posApples[a] += 1
+                self._appleIndex.add(a)
+
+    def _freeReset(self) -> None:
+        # puts every cell inside the border into the free cell index (set_pos_apple mode), the board must be empty
+        W = self.WIDTH
+        self._freeCells = array('i', [y*W+x for y in range(1, self.HEIGHT-self._SSBs(4, 3)+1) for x in range(1, W-1)])
+        self._freePos = array('i', [-1]) * len(self._snakeGrid)
+        for i, cell in enumerate(self._freeCells):
+            self._freePos[cell] = i
+
+    def _freeAdd(self, cell:int) -> None:
+        # adds a cell to the free cell index if it is inside the border and has no snake and no apple
+        x, y = cell % self.WIDTH, cell // self.WIDTH
+        if (self._freePos[cell] < 0 and not self._snakeGrid[cell] and (x, y) not in self._posApples
+            and 0 < x < self.WIDTH-1 and 0 < y <= self.HEIGHT-self._SSBs(4, 3)):
+            self._freePos[cell] = len(self._freeCells)
+            self._freeCells.append(cell)
+            if self._undoLog is not None:
+                self._undoLog.append((3,))
+
+    def _freeRemove(self, cell:int) -> None:
+        # removes a cell from the free cell index by moving the last free cell into its place
+        i = self._freePos[cell]
+        if i >= 0:
+            if self._undoLog is not None:
+                self._undoLog.append((4, cell, i))
+            last = self._freeCells.pop()
+            if last != cell:
+                self._freeCells[i] = last
+                self._freePos[last] = i
+            self._freePos[cell] = -1
+
+    def _removeApple(self, pos:tuple[int]) -> None:
+        # removes one apple from the coordinates, the coordinates are deleted when no apples are left there
+        if self._undoLog is not None:
+            self._undoLog.append((1, pos, self._posApples[pos]))
+        if self._posApples[pos] > 1:
+            self._posApples[pos] -= 1
+        else:
+            del self._posApples[pos]
+            self._appleIndex.remove(pos)
+            if self.SPA:
+                self._freeAdd(pos[1]*self.WIDTH+pos[0])
+        self._dirtyCells.add(pos)
+
+    def step(self, action:None|str=None) -> tuple[SnakeState, int, bool]:
+        """ Advances the game by one tick and returns (state, reward, done) """
+        log = self._undoLog
+        if log is not None:
+            log.append((0, (self._moveSnake, self._deltaX, self._deltaY, self._game_over, self._gameOverMessage, self._tick,
+                            self._posX_snake, self._posY_snake, self._lenSnake, self._rmCountApple)))
+        if action is not None:
+            if action not in self._deltaMove:
+                raise ValueError(f"No snake action '{action}'!")
+            self._moveSnake = action
+            self._deltaX, self._deltaY = self._deltaMove[action]
+        if self._game_over:
+            return self.state(), 0, True
+        self._tick += 1
+        lenSnake = self._lenSnake
+        # delete the position of the apple that was in the snake the first time it was there
+        if self._lenSnake == 1 and self.GO:
+            poscenter = ((self.WIDTH-2) // 2, (self.HEIGHT-self._SSBs(3, 2)) // 2)
+            if poscenter in self._posApples:
+                if log is not None:
+                    log.append((1, poscenter, self._posApples[poscenter]))
+                self._rmCountApple += self._posApples.pop(poscenter)
+                self._appleIndex.remove(poscenter)
+                self._dirtyCells.add(poscenter)
+                if self.SPA:
+                    self._freeAdd(poscenter[1]*self.WIDTH+poscenter[0])
+        # Check whether the position of the snake is the same as the position of one of the apples. If so, it will delete the coordinates of the apple eaten by the snake and add 1 apple randomly if self.GNA is True value..
+        if (self._posX_snake, self._posY_snake) in self._posApples:
+            self._removeApple((self._posX_snake, self._posY_snake))
+            if self.GNA:
+                self._rdmPosApples(generated=False)
+            self._lenSnake += 1
+        if self._profiler is not None:
+            self._profiler.mark('apples')
+
+        self._posX_snake += self._deltaX
+        self._posY_snake += self._deltaY
+        # check whether the position of the snake is outside the limits of the snake board. If yes then game over
+        if self._posX_snake < 0 or self._posX_snake > self.WIDTH-1 or self._posY_snake < 0 or self._posY_snake > self.HEIGHT-self._SSBs(3, 2):
+            if not self.GO:
+                self._posX_snake = (self._posX_snake + self.WIDTH) % (self.WIDTH)
+                self._posY_snake = (self._posY_snake + self.HEIGHT-self._SSBs(2, 1)) % (self.HEIGHT-self._SSBs(2, 1))
+            else:
+                self._game_over = True
+                self._gameOverMessage = 'BOARD EXIT'
+                return self.state(), self._lenSnake-lenSnake, True
+        snakeHead = (self._posX_snake, self._posY_snake)
+        if self._snakeList:
+            self._dirtyCells.add(self._snakeList[-1])
+        self._snakeList.append(snakeHead)
+        self._snakeGrid[snakeHead[1]*self.WIDTH+snakeHead[0]] += 1
+        if log is not None:
+            log.append((5,))
+        self._dirtyCells.add(snakeHead)
+        if self.SPA:
+            self._freeRemove(snakeHead[1]*self.WIDTH+snakeHead[0])
+        # Remove the tail from the snake so it looks as if the snake is moving
+        if len(self._snakeList) > self._lenSnake:
+            snakeTail = self._snakeList.popleft()
+            self._snakeGrid[snakeTail[1]*self.WIDTH+snakeTail[0]] -= 1
+            if log is not None:
+                log.append((6, snakeTail))
+            self._dirtyCells.add(snakeTail)
+            if self.SPA:
+                self._freeAdd(snakeTail[1]*self.WIDTH+snakeTail[0])
+        # check whether the snake's position hits any part of the snake's body. If yes then game over
+        if self._snakeGrid[snakeHead[1]*self.WIDTH+snakeHead[0]] > 1 and len(self._snakeList) > self.LS and self.GO:
+            self._game_over = True
+            self._gameOverMessage = 'CRASHING'
+        return self.state(), self._lenSnake-lenSnake, self._game_over
+
+    def bot_action(self) -> str:
+        """ BOT algorithm for playing snake, returns the next action for step() """
+        moveSnake = self._moveSnake
+        match self.BMT:
+            case 'neat':
+                if self._posApples:
+                    if moveSnake in ('w', 'a', 's', '') and self._posX_snake < self.WIDTH-2: moveSnake = 'd'
+                    if self._posX_snake == self.WIDTH-2:
+                        if moveSnake == 'w': moveSnake = 'd'
+                        else: moveSnake = 'w'
+                else: moveSnake = ''
+
+            case 'algorithm':
+                # the nearest apple in snake moves, around the edges when the snake can pass them
+                near_apple = self._appleIndex.nearest((self._posX_snake, self._posY_snake))
+                if near_apple:
+                    dx = _wrapOffset(self._posX_snake, near_apple[0], self.WIDTH, not self.GO)
+                    dy = _wrapOffset(self._posY_snake, near_apple[1], self.HEIGHT-self._SSBs(2, 1), not self.GO)
+                    if dx < 0: moveSnake = 'a'
+                    elif dx > 0: moveSnake = 'd'
+                    elif dy < 0: moveSnake = 'w'
+                    elif dy > 0: moveSnake = 's'
+                else: moveSnake = ''
+
+            case 'pathfinding':
+                moveSnake = self._botPathfinding()
+
+            case 'mcts':
+                moveSnake = self._botMcts()
+        return moveSnake
+
+    def _botNeighbourCells(self) -> list[tuple[tuple[str, int]]]:
+        # returns the actions and the next cells of every board cell (row * WIDTH + column), the moves that
+        # leave the board are left out in game over mode and wrap around otherwise
+        if self._botNeighbours is None:
+            rows = self.HEIGHT-self._SSBs(2, 1)
+            self._botNeighbours = []
+            for cell in range(self.WIDTH * rows):
+                x, y = cell % self.WIDTH, cell // self.WIDTH
+                nexts = []
+                for action in 'wasd':
+                    nx, ny = x + self._deltaMove[action][0], y + self._deltaMove[action][1]
+                    if 0 <= nx < self.WIDTH and 0 <= ny < rows:
+                        nexts.append((action, ny*self.WIDTH+nx))
+                    elif not self.GO:
+                        nexts.append((action, (ny % rows)*self.WIDTH + nx % self.WIDTH))
+                self._botNeighbours.append(tuple(nexts))
+        return self._botNeighbours
+
+    def _botSearch(self, start:int, blocked:object, goal:object, deadline:float) -> tuple[None|list[str], int, bool]:
+        # Breadth first search from a board cell that doesn't enter the cells where blocked(cell) is True (None for no
+        # obstacles). Returns the actions to the first cell where goal(cell) is True (None if there is no such cell or
+        # `goal` is None), the number of visited cells and whether the search finished before the deadline
+        neighbours = self._botNeighbourCells()
+        prev = {start: None}
+        pending = deque([start])
+        count = 0
+        while pending:
+            count += 1
+            if not count & 63 and time.perf_counter() > deadline:
+                return None, count, False
+            cell = pending.popleft()
+            if goal is not None and cell != start and goal(cell):
+                path = []
+                while prev[cell] is not None:
+                    cell, action = prev[cell]
+                    path.append(action)
+                return path[::-1], count, True
+            for action, nextCell in neighbours[cell]:
+                if nextCell in prev or (blocked is not None and blocked(nextCell)):
+                    continue
+                prev[nextCell] = (cell, action)
+                pending.append(nextCell)
+        return None, count, True
+
+    def _botSafe(self, path:list[str], deadline:float) -> bool:
+        # Checks that the head can still reach the tail (or enough free cells) after the snake moves along the path.
+        # The moved snake is the real body plus the changes of the path, so the check doesn't copy the whole body
+        W = self.WIDTH
+        grid = self._snakeGrid
+        neighbours = self._botNeighbourCells()
+        cell = self._posY_snake*W + self._posX_snake
+        length, size, removed = self._lenSnake, len(self._snakeList), 0
+        pathCells, eaten = [], set()
+        for action in path:
+            if cell not in eaten and (cell % W, cell // W) in self._posApples:
+                eaten.add(cell)
+                length += 1
+            cell = dict(neighbours[cell])[action]
+            pathCells.append(cell)
+            if size + len(pathCells) - removed > length:
+                removed += 1
+        change = Counter(pathCells)
+        for x, y in itertools.islice(self._snakeList, min(removed, size)):
+            change[y*W+x] -= 1
+        for removedCell in pathCells[:max(0, removed-size)]:
+            change[removedCell] -= 1
+        if removed < size:
+            tail = self._snakeList[removed][1]*W + self._snakeList[removed][0]
+        else:
+            tail = pathCells[removed-size]
+        length = size + len(pathCells) - removed
+        if tail == cell or length < 3:
+            return True
+        body = lambda c: grid[c] + change[c] > 0
+        # the apple at the end of the path makes the snake longer on the next tick, so the tail stays there for one more tick
+        toTail, _, finished = self._botSearch(cell, lambda c: c != tail and body(c), lambda c: c == tail, deadline)
+        if not finished:
+            return False
+        if toTail is not None and len(toTail) > 1:
+            return True
+        # the tail can't be followed, the path is still safe if there is room for the whole snake
+        visited = itertools.count(2)
+        room, _, _ = self._botSearch(cell, body, lambda c: next(visited) > length, deadline)
+        return room is not None
+
+    def _botSurvive(self, head:int, tail:int, deadline:float) -> str:
+        # Chooses the move that keeps the longest path to the tail, or the move into the largest free area
+        # if the tail can't be reached. Without time left it takes the first move that doesn't crash
+        grid = self._snakeGrid
+        blocked = lambda c: grid[c] and c != tail
+        moves = [(action, cell) for action, cell in self._botNeighbourCells()[head] if not blocked(cell)]
+        if not moves:
+            return self._moveSnake or 'd'
+        moves.sort(key=lambda move: move[0] != self._moveSnake)
+        best, bestScore = moves[0][0], None
+        for i, (action, cell) in enumerate(moves):
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                break
+            # share the time that is left between the moves
+            toTail, count, _ = self._botSearch(cell, blocked, lambda c: c == tail, time.perf_counter() + left/(len(moves)-i))
+            score = (1, len(toTail)) if toTail is not None else (0, count)
+            if bestScore is None or score > bestScore:
+                best, bestScore = action, score
+        return best
+
+    def _botPathfinding(self) -> str:
+        # BFS to the nearest reachable apple. In game over mode the path is only taken if the tail can still
+        # be reached after it, otherwise the snake follows its tail. Every decision stops at self.BTL seconds
+        deadline = time.perf_counter() + self.BTL
+        W = self.WIDTH
+        head = self._posY_snake*W + self._posX_snake
+        isApple = lambda cell: (cell % W, cell // W) in self._posApples
+        if not self.GO:
+            # the snake can't crash, so only the way to the apple matters
+            path, _, _ = self._botSearch(head, None, isApple, deadline)
+            return path[0] if path else ''
+        # the tail leaves its cell on this tick unless the snake grows
+        growing = len(self._snakeList) < self._lenSnake or (self._posX_snake, self._posY_snake) in self._posApples
+        tail = self._snakeList[0][1]*W + self._snakeList[0][0] if self._snakeList and not growing else -1
+        grid = self._snakeGrid
+        path, _, _ = self._botSearch(head, lambda c: grid[c] and c != tail, isApple, deadline)
+        if path and self._botSafe(path, deadline):
+            return path[0]
+        return self._botSurvive(head, tail, deadline)
+
+    def _botRollout(self, action:str, target:None|tuple[int], depth:int=20) -> float:
+        # Plays a short game from the action: mostly towards the target apple and never into the body if there
+        # is another way. Returns the apples eaten (less for later apples) and a penalty for a game over
+        W = self.WIDTH
+        grid, body, neighbours, rng, distance = self._snakeGrid, self._snakeList, self._botNeighbours, self._botRandom, self._appleIndex.distance
+        reward, discount = 0.0, 1.0
+        for _ in range(depth):
+            _, eaten, done = self.step(action)
+            if done:
+                return reward - 10*discount
+            reward += eaten*discount
+            discount *= 0.9
+            if target is not None and target not in self._posApples:
+                target = None
+            head = self._posY_snake*W + self._posX_snake
+            tail = body[0][1]*W + body[0][0]
+            moves = [move for move in neighbours[head] if not grid[move[1]] or move[1] == tail] or neighbours[head]
+            if target is not None and rng.random() < 0.75:
+                action = min(moves, key=lambda move: distance((move[1] % W, move[1] // W), target))[0]
+            else:
+                action = rng.choice(moves)[0]
+        if target is not None:
+            reward += 0.5*discount / (1 + distance((self._posX_snake, self._posY_snake), target))
+        return reward
+
+    def _botMcts(self) -> str:
+        # Monte-Carlo lookahead: plays rollouts after every safe move with snapshot() and undo() until self.BTL
+        # seconds are over, the moves are chosen by UCB1 and the move with the best average result is taken.
+        # The rollouts use their own random generator, so they don't change the apples of the real game
+        deadline = time.perf_counter() + self.BTL
+        W = self.WIDTH
+        grid = self._snakeGrid
+        head = self._posY_snake*W + self._posX_snake
+        tail = self._snakeList[0][1]*W + self._snakeList[0][0] if self._snakeList else -1
+        neighbours = self._botNeighbourCells()[head]
+        moves = [action for action, cell in neighbours if not grid[cell] or cell == tail] or [action for action, _ in neighbours]
+        if len(moves) < 2:
+            return moves[0] if moves else self._moveSnake
+        target = self._appleIndex.nearest((self._posX_snake, self._posY_snake))
+        totals, visits = dict.fromkeys(moves, 0.0), dict.fromkeys(moves, 0)
+        dirtyCells, apples, profiler, undoLog, undoRandom = self._dirtyCells, self._random, self._profiler, self._undoLog, self._undoRandom
+        self._dirtyCells, self._random, self._profiler = set(), self._botRandom, None
+        snapshot = self.snapshot(random_state=False)
+        try:
+            rollouts = 0
+            while rollouts < len(moves) or time.perf_counter() < deadline:
+                if rollouts < len(moves):
+                    action = moves[rollouts]
+                else:
+                    action = max(moves, key=lambda move: totals[move]/visits[move] + 2*math.sqrt(math.log(rollouts)/visits[move]))
+                totals[action] += self._botRollout(action, target)
+                visits[action] += 1
+                rollouts += 1
+                self.undo(snapshot)
+        finally:
+            self.undo(snapshot)
+            if undoLog is None:
+                self.release()
+            self._dirtyCells, self._random, self._profiler, self._undoRandom = dirtyCells, apples, profiler, undoRandom
+        return max(moves, key=lambda move: totals[move]/visits[move])
+
+
+class SnakeBatch:
+    """
+Many independent SnakeEngine games stepped together with NumPy arrays (requires `numpy`).
+
+>>> batch = SnakeBatch(1000, game_over=False, seed=1)
+>>> state, reward, done = batch.step(actions)
+
+`actions` has one action per board: 0, 1, 2, 3 for 'w', 'a', 's', 'd', 4 to stop the snake
+and -1 (or None for all boards) to keep the current direction. step() returns a SnakeState
+whose fields are arrays with one value per board (`head` has the shape (boards, 2) and `move`
+holds the action numbers), the apples eaten in the tick and whether each game is over.
+A board that is over is reset at the beginning of the next step().
+
+Board `i` uses the random generator of SnakeEngine(seed=seed+i) (or the seeds given as a
+list), so with the same actions it plays exactly the same game as that engine.
+    """
+    ACTIONS = ('w', 'a', 's', 'd', '') # actions of SnakeEngine.step() by action number
+
+    def __init__(self,
+                boards            :int  = 1024,
+                width             :int  = 80,
+                height            :int  = 24,
+                lots_of_apples    :int  = 20,
+                len_snake         :int  = 1,
+                generate_new_apple:bool = True,
+                set_pos_apple     :bool = False,
+                game_over         :bool = True,
+                show_score_board  :bool = True,
+                seed              :None|int|list[int] = None
+        ) -> None:
+        if np is None:
+            raise ImportError('Please install packages:\n  numpy `pip install numpy`')
+        if not isinstance(boards, int):
+            raise TypeError(f'Type argument boards:{type(boards).__name__} is not int')
+        if boards < 1:
+            raise ValueError(f'The value given is out of bounds.\nMIN:\n  boards: 1 - [got {boards}]')
+        _checkBoardArgs(width, height, lots_of_apples, len_snake, show_score_board)
+        if isinstance(seed, int) or seed is None:
+            seeds = [None if seed is None else seed+i for i in range(boards)]
+        elif len(seed) == boards:
+            seeds = list(seed)
+        else:
+            raise ValueError(f'Requires {boards} seeds, not {len(seed)}')
+
+        self.BOARDS = boards # number of games
+        self.WIDTH = width # width of display
+        self.HEIGHT = height # height of display
+        self.LOA = lots_of_apples # the number of apples in the game
+        self.LS = len_snake # snake length for the first time
+        self.GNA = bool(generate_new_apple) # produces a new apple every time you eat one if the value is True
+        self.SPA = bool(set_pos_apple) # adjusts the alignment of the apple's position if the value is True
+        self.GO = bool(game_over) # game over when leaving the board or crashing if the value is True
+        self.SSB = bool(show_score_board) # display scoreboard setting, it changes the board size
+
+        self._randoms = [random.Random(s) for s in seeds] # random generator of the apple coordinates of each board
+        self._rows = self.HEIGHT - (2 if self.SSB else 1) # board rows including the border
+        cells = self.WIDTH * self._rows
+        self._startX = (self.WIDTH-2) // 2
+        self._startY = (self.HEIGHT-(4 if self.SSB else 3)) // 2
+        self._posCenter = ((self.HEIGHT-(3 if self.SSB else 2)) // 2) * self.WIDTH + self._startX
+        self._deltaX = np.array([0, -1, 0, 1, 0], dtype=np.int32) # movement by action number
+        self._deltaY = np.array([-1, 0, 1, 0, 0], dtype=np.int32)
+        self._boardIndex = np.arange(boards)
+        self._cellOffset = self._boardIndex * cells # first cell of each board in the flat board arrays
+        # state of each board, the board cells are numbered row * WIDTH + column
+        self._snakeGrid = np.zeros((boards, cells), dtype=np.int32) # how many body parts are in each board cell
+        self._posApples = np.zeros((boards, cells), dtype=np.int32) # how many apples are in each board cell
+        self._appleCells = np.zeros(boards, dtype=np.int32) # number of cells with apples
+        self._snakeBody = np.zeros((boards, 1 << max(4, len_snake.bit_length()+1)), dtype=np.int32) # ring buffer of the body cells, the size is a power of 2
+        self._bodyOffset = self._boardIndex * self._snakeBody.shape[1] # first ring buffer cell of each board
+        self._bodyStart = np.zeros(boards, dtype=np.int64) # tail index in the ring buffer
+        self._bodyLen = np.zeros(boards, dtype=np.int64) # number of body cells
+        self._posX = np.zeros(boards, dtype=np.int32)
+        self._posY = np.zeros(boards, dtype=np.int32)
+        self._move = np.zeros(boards, dtype=np.int32)
+        self._lenSnake = np.zeros(boards, dtype=np.int64)
+        self._rmCountApple = np.zeros(boards, dtype=np.int64)
+        self._tick = np.zeros(boards, dtype=np.int64)
+        self._done = np.zeros(boards, dtype=bool)
+        # free cell index of each board like SnakeEngine (set_pos_apple mode)
+        maxY = self.HEIGHT - (4 if self.SSB else 3)
+        self._interior = np.zeros(cells, dtype=bool) # cells inside the border
+        self._interior.reshape(self._rows, self.WIDTH)[1:maxY+1, 1:self.WIDTH-1] = True
+        self._interiorCells = np.flatnonzero(self._interior).astype(np.int32)
+        shape = (boards, cells) if self.SPA else (boards, 0)
+        self._freeCells = np.zeros(shape, dtype=np.int32)
+        self._freePos = np.full(shape, -1, dtype=np.int32)
+        self._freeCount = np.zeros(boards, dtype=np.int64)
+        self._resetBoards(self._boardIndex)
+
+    def _rdmPosApples(self, board:int, generated:bool=True) -> None:
+        # same apple coordinates as SnakeEngine._rdmPosApples() for one board
+        rdm = self._randoms[board]
+        apples = self._posApples[board]
+        if self.SPA:
+            freeCells, freePos = self._freeCells[board], self._freePos[board]
+            for _ in range(self.LOA if generated else 1):
+                count = int(self._freeCount[board])
+                if not count:
+                    break # the board is full
+                i = rdm.randrange(count)
+                cell, last = freeCells[i], freeCells[count-1]
+                freeCells[i] = last
+                freePos[last] = i
+                freePos[cell] = -1
+                self._freeCount[board] = count-1
+                apples[cell] += 1
+                self._appleCells[board] += 1
+            return
+        maxY = self.HEIGHT - (4 if self.SSB else 3)
+        for _ in range(self.LOA if generated else 1):
+            cell = rdm.randint(1, self.WIDTH-2) + rdm.randint(1, maxY) * self.WIDTH
+            if not apples[cell]:
+                self._appleCells[board] += 1
+            apples[cell] += 1
+
+    def _freeAdd(self, boards, cells) -> None:
+        # SnakeEngine._freeAdd() for one cell on each of the boards
+        keep = ((self._freePos[boards, cells] < 0) & (self._snakeGrid[boards, cells] == 0)
+                & (self._posApples[boards, cells] == 0) & self._interior[cells])
+        boards, cells = boards[keep], cells[keep]
+        self._freeCells[boards, self._freeCount[boards]] = cells
+        self._freePos[boards, cells] = self._freeCount[boards]
+        self._freeCount[boards] += 1
+
+    def _freeRemove(self, boards, cells) -> None:
+        # SnakeEngine._freeRemove() for one cell on each of the boards
+        i = self._freePos[boards, cells]
+        boards, cells, i = boards[i >= 0], cells[i >= 0], i[i >= 0]
+        last = self._freeCells[boards, self._freeCount[boards]-1]
+        self._freeCells[boards, i] = last
+        self._freePos[boards, last] = i
+        self._freePos[boards, cells] = -1
+        self._freeCount[boards] -= 1
+
+    def _resetBoards(self, boards) -> None:
+        # starts a new game on the boards
+        self._snakeGrid[boards] = 0
+        self._posApples[boards] = 0
+        self._appleCells[boards] = 0
+        self._bodyStart[boards] = 0
+        self._bodyLen[boards] = 0
+        self._posX[boards] = self._startX
+        self._posY[boards] = self._startY
+        self._move[boards] = 4
+        self._lenSnake[boards] = self.LS
+        self._rmCountApple[boards] = 0
+        self._tick[boards] = 0
+        self._done[boards] = False
+        if self.SPA:
+            interior = self._interiorCells
+            self._freePos[boards] = -1
+            self._freeCells[boards[:, None], np.arange(interior.size)] = interior
+            self._freePos[boards[:, None], interior] = np.arange(interior.size, dtype=np.int32)
+            self._freeCount[boards] = interior.size
+        for board in boards.tolist():
+            self._rdmPosApples(board)
+
+    def _growBody(self) -> None:
+        # doubles the ring buffer size and moves every body to the beginning of the buffer
+        size = self._snakeBody.shape[1]
+        order = (self._bodyStart[:, None] + np.arange(size)) % size
+        body = np.zeros((self.BOARDS, size*2), dtype=np.int32)
+        body[:, :size] = self._snakeBody[self._boardIndex[:, None], order]
+        self._snakeBody = body
+        self._bodyOffset = self._boardIndex * body.shape[1]
+        self._bodyStart[:] = 0
+
+    def reset(self, seed:None|int|list[int]=None) -> SnakeState:
+        """ Starts a new game on every board, the random generators are seeded again if `seed` is given """
+        if seed is not None:
+            seeds = [seed+i for i in range(self.BOARDS)] if isinstance(seed, int) else list(seed)
+            if len(seeds) != self.BOARDS:
+                raise ValueError(f'Requires {self.BOARDS} seeds, not {len(seeds)}')
+            for rdm, s in zip(self._randoms, seeds):
+                rdm.seed(s)
+        self._resetBoards(self._boardIndex)
+        return self.state()
+
+    def state(self) -> SnakeState:
+        """ Returns the current state of every game """
+        return SnakeState(np.stack((self._posX, self._posY), axis=1), self._move.copy(), self._lenSnake.copy(),
+                          self._lenSnake-1, self._appleCells.copy(), self._tick.copy())
+
+    def step(self, actions=None) -> tuple[SnakeState, object, object]:
+        """ Advances every game by one tick and returns (state, reward, done) arrays """
+        if self._done.any():
+            self._resetBoards(np.flatnonzero(self._done))
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int32)
+            if actions.shape != (self.BOARDS,):
+                raise ValueError(f'Requires {self.BOARDS} actions, not {actions.shape}')
+            if ((actions < -1) | (actions > 4)).any():
+                raise ValueError('Snake actions are numbers from -1 to 4')
+            change = actions >= 0
+            self._move[change] = actions[change]
+        snakeGrid = self._snakeGrid.reshape(-1) # flat views, indexed by board offset + cell
+        posApples = self._posApples.reshape(-1)
+        snakeBody = self._snakeBody.reshape(-1)
+        lenSnake = self._lenSnake.copy()
+        self._tick += 1
+        # delete the apples at the start position while the snake has not eaten
+        if self.GO:
+            start = np.flatnonzero(self._lenSnake == 1)
+            count = self._posApples[start, self._posCenter]
+            start, count = start[count > 0], count[count > 0]
+            self._rmCountApple[start] += count
+            self._posApples[start, self._posCenter] = 0
+            self._appleCells[start] -= 1
+            if self.SPA:
+                self._freeAdd(start, np.full(start.size, self._posCenter))
+        # eat the apples under the head, one apple per tick like SnakeEngine
+        head = self._cellOffset + self._posY * self.WIDTH + self._posX
+        eat = np.flatnonzero(posApples[head])
+        if eat.size:
+            cells = head[eat]
+            posApples[cells] -= 1
+            self._appleCells[eat] -= posApples[cells] == 0
+            if self.SPA:
+                self._freeAdd(eat, cells - self._cellOffset[eat])
+            if self.GNA:
+                for board in eat.tolist():
+                    self._rdmPosApples(board, generated=False)
+            self._lenSnake[eat] += 1
+            if self._lenSnake[eat].max() >= self._snakeBody.shape[1]:
+                self._growBody()
+                snakeBody = self._snakeBody.reshape(-1)
+        # move and leave the board (game over) or wrap around
+        self._posX += self._deltaX[self._move]
+        self._posY += self._deltaY[self._move]
+        if self.GO:
+            out = (self._posX < 0) | (self._posX > self.WIDTH-1) | (self._posY < 0) | (self._posY > self._rows-1)
+            self._done |= out
+            alive = np.flatnonzero(~out)
+        else:
+            self._posX %= self.WIDTH
+            self._posY %= self._rows
+            alive = self._boardIndex
+        # add the head and remove the tail
+        mask = self._snakeBody.shape[1] - 1
+        head = self._cellOffset[alive] + self._posY[alive] * self.WIDTH + self._posX[alive]
+        snakeGrid[head] += 1
+        snakeBody[self._bodyOffset[alive] + ((self._bodyStart[alive] + self._bodyLen[alive]) & mask)] = head - self._cellOffset[alive]
+        self._bodyLen[alive] += 1
+        if self.SPA:
+            self._freeRemove(alive, head - self._cellOffset[alive])
+        tail = np.flatnonzero(self._bodyLen > self._lenSnake)
+        tailCells = snakeBody[self._bodyOffset[tail] + self._bodyStart[tail]]
+        snakeGrid[self._cellOffset[tail] + tailCells] -= 1
+        if self.SPA:
+            self._freeAdd(tail, tailCells)
+        self._bodyStart[tail] = (self._bodyStart[tail] + 1) & mask
+        self._bodyLen[tail] -= 1
+        # crash into the body
+        if self.GO:
+            crash = (snakeGrid[head] > 1) & (self._bodyLen[alive] > self.LS)
+            self._done[alive[crash]] = True
+        return self.state(), self._lenSnake-lenSnake, self._done.copy()
+
+class SnakeArena:
+    """
+Many bot snakes on one board that move at the same time and share the apples (standard library only).
+
+>>> arena = SnakeArena(200, width=258, height=128, seed=1)
+>>> states, rewards, dead = arena.step()
+
+`step(actions)` moves every snake by one tick. `actions` has one action per snake like
+SnakeEngine.step() (None keeps the direction, '' stops the snake), without `actions` every
+snake plays the `bot_move_type` bot. All snakes move at the same time: first the tails move
+away, then a snake dies when its head leaves the board (game over mode), hits a body or meets
+another head on the same cell. A snake grows by one for every apple it eats. Dead snakes are
+placed again on a free cell with `respawn`. step() returns the SnakeState of every snake (None
+for a snake that isn't on the board), the apples eaten by every snake and which snakes died.
+
+All snakes are on one occupancy grid, so a tick costs about the same for every snake however
+long the snakes are. `timings()` returns the percentiles of the phases of the last ticks.
+    """
+    PHASES = ('bot', 'move', 'collision', 'apples', 'respawn') # phases of a tick in timings()
+    REVERSE = {'w': 's', 'a': 'd', 's': 'w', 'd': 'a', '': ''} # the move back into the neck of the snake
+
+    def __init__(self,
+                snakes            :int  = 100,
+                width             :int  = 258,
+                height            :int  = 128,
+                lots_of_apples    :int  = 200,
+                len_snake         :int  = 3,
+                generate_new_apple:bool = True,
+                game_over         :bool = True,
+                show_score_board  :bool = True,
+                bot_move_type     :str  = 'greedy',
+                respawn           :bool = True,
+                seed              :None|int = None
+        ) -> None:
+        _checkBoardArgs(width, height, lots_of_apples, len_snake, show_score_board)
+        if not isinstance(snakes, int):
+            raise TypeError(f'Type argument snakes:{type(snakes).__name__} is not int')
+        if (1000 < snakes) or (snakes < 1):
+            raise ValueError(f'The value given is out of bounds.\nMIN, MAX:\n  snakes: 1, 1000 - [got {snakes}]')
+        if not bot_move_type in ('greedy', 'random'):
+            raise TypeError(f"No arena bot mode with type '{bot_move_type}'!")
+
+        self.SNAKES = snakes # number of snakes
+        self.WIDTH = width # width of display
+        self.HEIGHT = height # height of display
+        self.LOA = lots_of_apples # the number of apples in the game
+        self.LS = len_snake # snake length for the first time
+        self.GNA = bool(generate_new_apple) # produces a new apple every time a snake eats one if the value is True
+        self.GO = bool(game_over) # a snake dies when it leaves the board if the value is True, otherwise it comes back on the other side
+        self.SSB = bool(show_score_board) # display scoreboard setting, it changes the board size
+        self.BMT = bot_move_type # types bot moving
+        self.RS = bool(respawn) # dead snakes are placed again if the value is True
+        self.SEED = seed # seed of the random generator
+
+        self._random = random.Random(seed) # random generator of the apples, the snakes and the bots
+        self._deltaMove = {'w': (0, -1), 'a': (-1, 0), 's': (0, 1), 'd': (1, 0), '': (0, 0)}
+        self._rows = self.HEIGHT - (2 if self.SSB else 1) # board rows including the border
+        self._maxY = self.HEIGHT - (4 if self.SSB else 3) # last row inside the border
+        cells = self.WIDTH * self._rows
+        self._grid = array('I', [0]) * cells # how many body parts of all snakes are in each board cell
+        self._applePos = array('i', [-1]) * cells # index of each cell in self._appleCells, -1 if the cell has no apple
+        self._appleCells = array('i') # cells with an apple, one apple per cell
+        self._appleIndex = AppleIndex(self.WIDTH, self._rows, wrap=not self.GO, bucket=min(32, max(2, 2*math.isqrt(cells // self.LOA)))) # nearest apples of the bots
+        # state of each snake, the board cells are numbered row * WIDTH + column
+        self._bodies = [deque() for _ in range(snakes)] # body cells from the tail to the head
+        self._heads = array('i', [-1]) * snakes # head cell, -1 if the snake isn't on the board
+        self._lenSnake = array('i', [0]) * snakes
+        self._moves = [''] * snakes # the direction each snake walks
+        self._targets = array('i', [-1]) * snakes # apple cell the 'greedy' bot goes to
+        self._scores = array('i', [0]) * snakes
+        self._tick = 0
+        self._deaths = Counter() # how many snakes died of each reason
+        self._profiler = FrameProfiler(phases=self.PHASES) # times the phases of every tick
+        # the cells after the moves 'w', 'a', 's', 'd' of every cell and the moves the bots try after each direction
+        self._neighbours = [tuple(self._nextCell(cell, action) for action in 'wasd') for cell in range(cells)]
+        self._botOrder = {move: (move,)*bool(move) + tuple(a for a in 'wasd' if a != move and a != self.REVERSE[move]) for move in self._deltaMove}
+        self._botOrderIndex = {move: tuple('wasd'.index(a) for a in order) for move, order in self._botOrder.items()}
+        self.reset()
+
+    def reset(self, seed:None|int=None) -> list[None|SnakeState]:
+        """ Starts a new game with new snakes and apples, the random generator is seeded again if `seed` is given """
+        if seed is not None:
+            self.SEED = seed
+            self._random.seed(seed)
+        self._grid = array('I', [0]) * len(self._grid)
+        self._applePos = array('i', [-1]) * len(self._applePos)
+        self._appleCells = array('i')
+        self._appleIndex.clear()
+        self._tick = 0
+        self._deaths.clear()
+        for i in range(self.SNAKES):
+            self._bodies[i].clear()
+            self._heads[i] = -1
+            self._scores[i] = 0
+            self._spawn(i)
+        for _ in range(self.LOA):
+            self._addApple()
+        return self.states()
+
+    def state(self, snake:int) -> None|SnakeState:
+        """ Returns the current state of a snake, None if it isn't on the board """
+        head = self._heads[snake]
+        if head < 0:
+            return None
+        return SnakeState((head % self.WIDTH, head // self.WIDTH), self._moves[snake], self._lenSnake[snake], self._scores[snake],
+                          len(self._appleCells), self._tick)
+
+    def states(self) -> list[None|SnakeState]:
+        """ Returns the current state of every snake """
+        return [self.state(i) for i in range(self.SNAKES)]
+
+    def _randomCell(self) -> None|int:
+        # returns a random cell inside the border without snake and apple, None if a few tries found none
+        rdm = self._random
+        for _ in range(32):
+            cell = rdm.randint(1, self._maxY) * self.WIDTH + rdm.randint(1, self.WIDTH-2)
+            if not self._grid[cell] and self._applePos[cell] < 0:
+                return cell
+        return None
+
+    def _spawn(self, snake:int) -> None:
+        # places the snake on a random free cell, it grows to len_snake on its first ticks like SnakeEngine
+        cell = self._randomCell()
+        if cell is None:
+            return # the board is too full, it's tried again on the next tick
+        self._bodies[snake].append(cell)
+        self._grid[cell] += 1
+        self._heads[snake] = cell
+        self._lenSnake[snake] = self.LS
+        self._moves[snake] = self._random.choice('wasd')
+        self._targets[snake] = -1
+
+    def _addApple(self) -> None:
+        # puts an apple on a random free cell
+        cell = self._randomCell()
+        if cell is not None:
+            self._applePos[cell] = len(self._appleCells)
+            self._appleCells.append(cell)
+            self._appleIndex.add((cell % self.WIDTH, cell // self.WIDTH))
+
+    def _removeApple(self, cell:int) -> None:
+        # removes the apple of the cell by moving the last apple into its place
+        i = self._applePos[cell]
+        last = self._appleCells.pop()
+        if last != cell:
+            self._appleCells[i] = last
+            self._applePos[last] = i
+        self._applePos[cell] = -1
+        self._appleIndex.remove((cell % self.WIDTH, cell // self.WIDTH))
+
+    def _nextCell(self, cell:int, action:str) -> int:
+        # returns the cell after one move, -1 if the move leaves the board in game over mode
+        dx, dy = self._deltaMove[action]
+        x, y = cell % self.WIDTH + dx, cell // self.WIDTH + dy
+        if 0 <= x < self.WIDTH and 0 <= y < self._rows:
+            return y*self.WIDTH + x
+        if self.GO:
+            return -1
+        return (y % self._rows)*self.WIDTH + x % self.WIDTH
+
+    def bot_actions(self) -> list[None|str]:
+        """ Returns the next action of every snake by the `bot_move_type` bot, None for snakes that aren't on the board """
+        grid, apples, rdm, neighbours = self._grid, self._appleCells, self._random, self._neighbours
+        heads = {head for head in self._heads if head >= 0}
+        actions = []
+        for i in range(self.SNAKES):
+            head = self._heads[i]
+            if head < 0:
+                actions.append(None)
+                continue
+            # the current direction first, so the snake keeps going straight on a tie
+            safe = [(action, cell) for action, cell in zip(self._botOrder[self._moves[i]], [neighbours[head][j] for j in self._botOrderIndex[self._moves[i]]])
+                    if cell >= 0 and not grid[cell]]
+            # a cell next to another head can be taken by that snake in the same tick
+            safe = [option for option in safe if not any(cell != head and cell in heads for cell in neighbours[option[1]])] or safe
+            if not safe:
+                actions.append(None) # every move crashes
+            elif self.BMT == 'random':
+                actions.append(rdm.choice(safe)[0])
+            else:
+                # 'greedy': the shortest way to its apple, the nearest apple again when another snake ate it
+                target = self._targets[i]
+                if (target < 0 or self._applePos[target] < 0) and apples:
+                    x, y = self._appleIndex.nearest((head % self.WIDTH, head // self.WIDTH))
+                    target = self._targets[i] = y*self.WIDTH + x
+                if target < 0 or self._applePos[target] < 0:
+                    actions.append(safe[0][0])
+                else:
+                    goal, W = (target % self.WIDTH, target // self.WIDTH), self.WIDTH
+                    actions.append(min(safe, key=lambda option: self._appleIndex.distance((option[1] % W, option[1] // W), goal))[0])
+        return actions
+
+    def step(self, actions:None|list[None|str]=None) -> tuple[list[None|SnakeState], list[int], list[bool]]:
+        """ Moves every snake by one tick and returns (states, rewards, dead) with one value per snake """
+        profiler = self._profiler
+        profiler.start()
+        if actions is None:
+            actions = self.bot_actions()
+        elif len(actions) != self.SNAKES:
+            raise ValueError(f'Requires {self.SNAKES} actions, not {len(actions)}')
+        for i, action in enumerate(actions):
+            if action is not None and self._heads[i] >= 0:
+                if action not in self._deltaMove:
+                    raise ValueError(f"No snake action '{action}'!")
+                self._moves[i] = action
+        profiler.mark('bot')
+        self._tick += 1
+        grid, applePos, heads, bodies, lens = self._grid, self._applePos, self._heads, self._bodies, self._lenSnake
+        rewards = [0] * self.SNAKES
+        dead = [False] * self.SNAKES
+        died = [] # (snake, reason)
+        # the new head of every moving snake, the tails move away before any head arrives
+        moving = []
+        headCount = Counter()
+        for i in range(self.SNAKES):
+            head = heads[i]
+            if head < 0 or not self._moves[i]:
+                continue # not on the board or stopped
+            cell = self._nextCell(head, self._moves[i])
+            if cell < 0:
+                died.append((i, 'BOARD EXIT'))
+                continue
+            body = bodies[i]
+            if applePos[cell] < 0 and len(body) >= lens[i]:
+                tail = body.popleft()
+                grid[tail] -= 1
+            moving.append((i, cell))
+            headCount[cell] += 1
+        profiler.mark('move')
+        # the heads against the bodies after the move and against each other
+        for i, cell in moving:
+            if headCount[cell] > 1:
+                died.append((i, 'HEAD ON'))
+            elif grid[cell]:
+                died.append((i, 'CRASHING'))
+            else:
+                bodies[i].append(cell)
+                grid[cell] += 1
+                heads[i] = cell
+        for i, reason in died:
+            # the body of a dead snake leaves the board
+            for cell in bodies[i]:
+                grid[cell] -= 1
+            bodies[i].clear()
+            heads[i] = -1
+            dead[i] = True
+            self._deaths[reason] += 1
+        profiler.mark('collision')
+        # only a snake that lived can be on an apple, two snakes on the same apple both died
+        for i, cell in moving:
+            if not dead[i] and applePos[cell] >= 0:
+                self._removeApple(cell)
+                if self.GNA:
+                    self._addApple()
+                lens[i] += 1
+                self._scores[i] += 1
+                rewards[i] = 1
+        profiler.mark('apples')
+        if self.RS:
+            for i in range(self.SNAKES):
+                if heads[i] < 0:
+                    self._scores[i] = 0
+                    self._spawn(i)
+        profiler.mark('respawn')
+        profiler.frame()
+        return self.states(), rewards, dead
+
+    def timings(self) -> dict:
+        """ Returns the snakes on the board, the deaths and the milliseconds of the phases of the last ticks (see FrameProfiler) """
+        return {'tick': self._tick, 'snakes': sum(head >= 0 for head in self._heads), 'apples': len(self._appleCells),
+                'deaths': dict(self._deaths), 'phases': self._profiler.stats()}
+
+class HighScores:
+    """
+High scores saved in a file by game configuration. The file is read once, new high scores are
+kept in memory and written at most every `flush_interval` seconds by flush(force=False), or
+right away by flush(). The file is replaced atomically, so it is never left half written.
+The score of an old file (one number for every game) is the high score of every configuration
+that has no high score of its own yet.
+
+>>> scores = HighScores('SNAKE-SCORE.hi')
+>>> scores.update('80x24 ...', 12)
+>>> scores.flush()
+    """
+    def __init__(self, path:str='SNAKE-SCORE.hi', flush_interval:float=5.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self._scores = {} # high score by configuration key
+        self._dirty = False # the scores changed since they were written
+        self._lastFlush = time.monotonic()
+        try:
+            with open(path, 'r', encoding='utf8') as hi:
+                data = hi.read()
+        except OSError:
+            return # no file or an unreadable file, start without high scores
+        if data.strip().isdigit():
+            # old file with one score for every game, see get()
+            self._scores['legacy'] = int(data)
+            return
+        try:
+            scores = json.loads(data)
+        except ValueError:
+            return
+        if isinstance(scores, dict):
+            self._scores = {str(key): score for key, score in scores.items() if isinstance(score, int)}
+
+    def get(self, key:str) -> int:
+        """ Returns the high score of the configuration, the score of an old file or 0 if there is none """
+        return self._scores.get(key, self._scores.get('legacy', 0))
+
+    def update(self, key:str, score:int) -> int:
+        """ Saves the score if it is higher than the high score and returns the high score """
+        if score > self.get(key):
+            self._scores[key] = score
+            self._dirty = True
+        return self.get(key)
+
+    def flush(self, force:bool=True) -> None:
+        """ Writes the changed scores to the file, without `force` only when flush_interval seconds have passed """
+        if not self._dirty or (not force and time.monotonic() - self._lastFlush < self.flush_interval):
+            return
+        self._lastFlush = time.monotonic()
+        folder = os.path.dirname(os.path.abspath(self.path))
+        try:
+            try:
+                mode = os.stat(self.path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            fd, temp = tempfile.mkstemp(prefix='.SNAKE-SCORE-', dir=folder)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf8') as hi:
+                    json.dump(self._scores, hi, indent=1, sort_keys=True)
+                # mkstemp() makes the file readable by its owner only, the high score file keeps its mode
+                os.chmod(temp, mode)
+                os.replace(temp, self.path)
+            except BaseException:
+                os.remove(temp)
+                raise
+        except OSError:
+            return # the scores stay dirty and are written on the next flush
+        self._dirty = False
+
+class FrameProfiler:
+    """
+Times the phases of every game frame and keeps the last `window` frames of each phase, so the
+percentiles show which phase takes the frame time. mark(phase) adds the time since the previous
+mark to the phase, frame() ends the frame. The times are saved in milliseconds. `phases` are the
+names of the phases, the phases of the Snake frames by default.
+
+>>> profiler = FrameProfiler()
+>>> profiler.mark('board')
+>>> profiler.frame()
+>>> profiler.percentiles('board') # p50, p95, p99
+    """
+    PHASES = ('apples', 'move', 'publish', 'board', 'display', 'score', 'bot', 'sleep')
+
+    def __init__(self, window:int=600, phases:tuple[str]=PHASES) -> None:
+        self.window = window
+        self.phases = tuple(phases)
+        self.frames = 0 # frames ended since the start
+        self._times = {phase: deque(maxlen=window) for phase in self.phases + ('frame',)} # the last frame times of each phase
+        self._total = dict.fromkeys(self.phases + ('frame',), 0.0) # time of each phase since the start
+        self._current = dict.fromkeys(self.phases, 0.0) # time of each phase in the current frame
+        self._skip = False # the current frame is not saved
+        self._last = time.perf_counter()
+
+    def start(self) -> None:
+        """ Starts the current frame here, the time since the previous mark isn't added to any phase """
+        self._last = time.perf_counter()
+
+    def mark(self, phase:str) -> None:
+        """ Adds the time since the previous mark to the phase of the current frame """
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def skip(self) -> None:
+        """ The current frame is not saved, for example when the game waited for the player in it """
+        self._skip = True
+
+    def frame(self) -> None:
+        """ Ends the current frame """
+        if self._skip:
+            self._skip = False
+            self._current = dict.fromkeys(self.phases, 0.0)
+            self._last = time.perf_counter()
+            return
+        frame = 0.0
+        for phase, seconds in self._current.items():
+            self._times[phase].append(seconds*1000)
+            self._total[phase] += seconds*1000
+            self._current[phase] = 0.0
+            frame += seconds
+        self._times['frame'].append(frame*1000)
+        self._total['frame'] += frame*1000
+        self.frames += 1
+
+    def percentiles(self, phase:str, percents:tuple[int]=(50, 95, 99)) -> tuple[float]:
+        """ Returns the percentiles of the phase times in the window """
+        times = sorted(self._times[phase])
+        if not times:
+            return tuple(0.0 for _ in percents)
+        return tuple(times[max(0, math.ceil(percent/100*len(times))-1)] for percent in percents)
+
+    def stats(self) -> list[dict]:
+        """ Returns the statistics of every phase and the whole frame """
+        stats = []
+        for phase in self.phases + ('frame',):
+            p50, p95, p99 = self.percentiles(phase)
+            times = self._times[phase]
+            stats.append({'phase': phase, 'frames': self.frames, 'mean_ms': self._total[phase]/self.frames if self.frames else 0.0,
+                          'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': max(times) if times else 0.0})
+        return stats
+
+    def overlay(self) -> str:
+        """ Returns one line with the frame percentiles and the p95 of the phases, the slowest phase first """
+        p50, p95, p99 = self.percentiles('frame')
+        phases = sorted(((self.percentiles(phase, (95,))[0], phase) for phase in self.phases), reverse=True)
+        return f'ms p50/95/99:{p50:.1f}/{p95:.1f}/{p99:.1f} p95 ' + ' '.join(f'{phase}:{time:.2f}' for time, phase in phases)
+
+    def dump(self, path:str) -> None:
+        """ Writes the statistics to a CSV file if the path ends with '.csv', otherwise to a JSON file """
+        stats = self.stats()
+        with open(path, 'w', encoding='utf8', newline='') as file:
+            if path.lower().endswith('.csv'):
+                file.write(','.join(stats[0]) + '\n')
+                for row in stats:
+                    file.write(','.join(str(value) for value in row.values()) + '\n')
+            else:
+                json.dump({'window': self.window, 'frames': self.frames, 'phases': stats}, file, indent=1)
+
+class Replay:
+    """
+Recording of a game that can be played again without the terminal. It saves the configuration with
+the seed, the action given to step() on every tick (run-length encoded) and the pause, continue, reset
+and quit events. The file is a small binary file: b'WSRP', the version, the configuration in JSON and
+the zlib compressed records. A record is a varint of `count << 3 | code`, codes 0-5 are `count` ticks of
+one action of Replay.ACTIONS and code 6 is the event Replay.EVENTS[count].
+
+>>> replay = Replay.load('game.wsr')
+>>> engine = replay.seek(5000) # the game after tick 5000
+>>> for tick, engine in replay.frames([10, 20, 30]):
+...     print(tick, engine.state())
+    """
+    ACTIONS = (None, '', 'w', 'a', 's', 'd')
+    EVENTS = ('pause', 'continue', 'reset', 'quit')
+    ENGINE_CONFIG = ('width', 'height', 'lots_of_apples', 'len_snake', 'generate_new_apple', 'set_pos_apple', 'game_over',
+                     'show_score_board', 'bot_move_type', 'bot_time_limit', 'seed')
+    VERSION = 1
+
+    def __init__(self, config:dict) -> None:
+        if config.get('seed') is None:
+            raise ValueError('A replay needs the seed of the game')
+        self.config = dict(config) # arguments of the game, at least the ENGINE_CONFIG arguments
+        self.ticks = 0 # recorded ticks
+        self._records = [] # [code, count] of every action run and event
+
+    def action(self, action:None|str) -> None:
+        """ Records the action given to step() on the next tick """
+        code = self.ACTIONS.index(action)
+        if self._records and self._records[-1][0] == code:
+            self._records[-1][1] += 1
+        else:
+            self._records.append([code, 1])
+        self.ticks += 1
+
+    def event(self, event:str) -> None:
+        """ Records an event after the last tick """
+        self._records.append([6, self.EVENTS.index(event)])
+
+    def events(self) -> list[tuple[int, str]]:
+        """ Returns the events with the tick they happened after """
+        events = []
+        tick = 0
+        for code, count in self._records:
+            if code == 6:
+                events.append((tick, self.EVENTS[count]))
+            else:
+                tick += count
+        return events
+
+    def save(self, path:str) -> None:
+        """ Writes the replay to a file """
+        records = bytearray()
+        for code, count in self._records:
+            value = count << 3 | code
+            while value > 0x7f:
+                records.append(value & 0x7f | 0x80)
+                value >>= 7
+            records.append(value)
+        config = json.dumps(self.config).encode('utf8')
+        with open(path, 'wb') as file:
+            file.write(b'WSRP' + struct.pack('<BI', self.VERSION, len(config)) + config + zlib.compress(records, 9))
+
+    @classmethod
+    def load(cls, path:str) -> 'Replay':
+        """ Reads a replay file """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if data[:4] != b'WSRP':
+            raise ValueError(f"'{path}' is not a WinSnake replay file")
+        version, size = struct.unpack_from('<BI', data, 4)
+        if version != cls.VERSION:
+            raise ValueError(f'No replay file version {version}!')
+        start = 4 + struct.calcsize('<BI')
+        replay = cls(json.loads(data[start:start+size].decode('utf8')))
+        records = zlib.decompress(data[start+size:])
+        value = shift = 0
+        for byte in records:
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if byte & 0x80:
+                continue
+            code, count = value & 7, value >> 3
+            replay._records.append([code, count])
+            if code != 6:
+                replay.ticks += count
+            value = shift = 0
+        return replay
+
+    def engine(self) -> SnakeEngine:
+        """ Returns a new SnakeEngine with the configuration of the game """
+        return SnakeEngine(**{key: self.config[key] for key in self.ENGINE_CONFIG if key in self.config})
+
+    def frames(self, ticks=None, engine:None|SnakeEngine=None):
+        """ Plays the game again without sleeping and yields (tick, engine) after the given ticks, or after every tick if `ticks` is None """
+        engine = self.engine() if engine is None else engine
+        engine.reset(seed=self.config['seed'])
+        ticks = None if ticks is None else set(ticks)
+        last = max(ticks, default=0) if ticks is not None else self.ticks
+        tick = 0
+        for code, count in self._records:
+            if tick >= last:
+                return
+            if code == 6:
+                if self.EVENTS[count] == 'reset':
+                    # the player continued after the game over
+                    engine.reset()
+                continue
+            action = self.ACTIONS[code]
+            step = engine.step
+            if ticks is None:
+                for _ in range(count):
+                    step(action)
+                    tick += 1
+                    yield tick, engine
+            else:
+                for _ in range(min(count, last - tick)):
+                    step(action)
+                    tick += 1
+                    if tick in ticks:
+                        yield tick, engine
+
+    def seek(self, tick:int, engine:None|SnakeEngine=None) -> SnakeEngine:
+        """ Returns the engine with the game after the tick """
+        engine = self.engine() if engine is None else engine
+        for _ in self.frames([tick], engine):
+            pass
+        return engine
+
+class HookInput:
+    """
+Event input backend for Windows: the `keyboard` module calls back on every key press and the
+keys are put in a queue, so no key press is lost between two frames.
+    """
+    def __init__(self) -> None:
+        self._keys = queue.Queue() # key presses that are not read yet
+        self._hook = None
+        self._suspended = False # ignore keys while the game reads a line with input()
+
+    def _onPress(self, event) -> None:
+        if not self._suspended and event.name:
+            self._keys.put(event.name.lower() if len(event.name) == 1 else event.name)
+
+    def start(self) -> None:
+        self._hook = keyboard.on_press(self._onPress)
+
+    def stop(self) -> None:
+        if self._hook is not None:
+            keyboard.unhook(self._hook)
+            self._hook = None
+
+    def keys(self) -> list[str]:
+        """ Returns the keys pressed since the last call without waiting """
+        keys = []
+        while True:
+            try:
+                keys.append(self._keys.get_nowait())
+            except queue.Empty:
+                return keys
+
+    def getch(self) -> str:
+        """ Waits for the next key press """
+        return self._keys.get()
+
+    def suspend(self) -> None:
+        self._suspended = True
+
+    def resume(self) -> None:
+        self.keys()
+        self._suspended = False
+
+
+class PosixInput(HookInput):
+    """
+Event input backend for POSIX terminals: a reader thread waits for key presses on the terminal
+(termios cbreak mode and select) and puts them in a queue. The arrow keys are read as w, a, s, d.
+    """
+    ARROWS = {'A': 'w', 'B': 's', 'C': 'd', 'D': 'a'}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._fd = sys.stdin.fileno()
+        self._attrs = None # terminal attributes before the game
+        self._thread = None
+        self._running = False
+
+    def _read(self) -> None:
+        # reader thread
+        escape = ''
+        while self._running:
+            if self._suspended:
+                time.sleep(0.05)
+                continue
+            ready, _, _ = select.select([self._fd], [], [], 0.05)
+            if not ready or self._suspended:
+                continue
+            char = os.read(self._fd, 1).decode('utf8', 'ignore')
+            if not char:
+                # end of the input, same as Ctrl + D
+                self._keys.put('\x04')
+                self._running = False
+                break
+            if escape or char == '\033':
+                escape += char
+                if len(escape) == 3:
+                    if escape[1] == '[' and escape[2] in self.ARROWS:
+                        self._keys.put(self.ARROWS[escape[2]])
+                    escape = ''
+                continue
+            self._keys.put(char.lower())
+
+    def start(self) -> None:
+        self._attrs = termios.tcgetattr(self._fd)
+        tty.setcbreak(self._fd)
+        self._running = True
+        self._thread = threading.Thread(target=self._read, name='WinSnake-input', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._attrs is not None:
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._attrs)
+            self._attrs = None
+
+    def suspend(self) -> None:
+        # give the terminal back to input(), the reader thread doesn't read while suspended
+        self._suspended = True
+        if self._attrs is not None:
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._attrs)
+
+    def resume(self) -> None:
+        if self._attrs is not None:
+            tty.setcbreak(self._fd)
+        super().resume()
+
+
+class SpectatorServer:
+    """
+Local server that sends the game to spectators (viewer.py) over TCP on localhost or a Unix socket.
+The server runs an asyncio event loop in its own thread, so the game loop only hands over one
+message per tick. Every message is a line of JSON: a spectator gets a keyframe with the whole
+board first and then the changed cells of every tick. A spectator that can't keep up loses the
+messages in its queue and gets the next keyframe, so it never slows down the game.
+
+>>> server = SpectatorServer(8765) # or SpectatorServer('/tmp/snake.sock')
+>>> server.start()
+>>> server.publish(delta, keyframe) # every tick: bytes and a function that returns the keyframe bytes
+>>> server.stop()
+    """
+    def __init__(self, address:int|str, queue_size:int=64) -> None:
+        self.address = address # TCP port on localhost or the path of the Unix socket
+        self.queue_size = queue_size # messages kept for a slow spectator
+        self.clients = {} # message queue and whether it waits for a keyframe, by spectator writer
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._keyframeWanted = False # a spectator waits for a keyframe
+
+    def start(self) -> None:
+        """ Starts the server thread, raises OSError if the address can't be used """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='WinSnake-spectator', daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._serve(), self._loop).result()
+        except BaseException:
+            self.stop()
+            raise
+
+    async def _serve(self) -> None:
+        if isinstance(self.address, int):
+            self._server = await asyncio.start_server(self._client, '127.0.0.1', self.address)
         else:
-            print(f'WinSnake ERROR: \033[31m{type_error}\033[0m: {e}')
-        exit(-2)
-else:
-    print('\033[31mERROR\033[0m - THIS SOFTWARE ONLY WORKS IN A WINDOWS ENVIRONMENT')
-    print('Exit - Exit code: \033[31m-1\033[0m')
-    exit(-1)
-
-class Snake:
+            self._server = await asyncio.start_unix_server(self._client, self.address)
+
+    async def _client(self, reader, writer) -> None:
+        # sends the messages of one spectator
+        messages = asyncio.Queue(self.queue_size)
+        self.clients[writer] = [messages, True]
+        self._keyframeWanted = True
+        try:
+            while True:
+                writer.write(await messages.get())
+                await writer.drain()
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass # the spectator left or the server stops
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    def _broadcast(self, delta:bytes, keyframe:None|bytes) -> None:
+        # puts the message of a tick in the queue of every spectator (in the server thread)
+        for client in self.clients.values():
+            messages, waiting = client
+            if waiting:
+                if keyframe is not None:
+                    messages.put_nowait(keyframe)
+                    client[1] = False
+                continue
+            try:
+                messages.put_nowait(delta)
+            except asyncio.QueueFull:
+                # the spectator is too slow, it goes on from the next keyframe
+                while not messages.empty():
+                    messages.get_nowait()
+                client[1] = True
+                self._keyframeWanted = True
+
+    def publish(self, delta:bytes, keyframe) -> None:
+        """ Sends the message of a tick, keyframe() is only called when a spectator needs the whole board """
+        frame = None
+        if self._keyframeWanted:
+            self._keyframeWanted = False
+            frame = keyframe()
+        self._loop.call_soon_threadsafe(self._broadcast, delta, frame)
+
+    def restart(self) -> None:
+        """ Sends a keyframe to every spectator on the next tick, for example after a new game started """
+        def wait():
+            for client in self.clients.values():
+                client[1] = True
+            self._keyframeWanted = True
+        self._loop.call_soon_threadsafe(wait)
+
+    def stop(self) -> None:
+        """ Closes the connections and stops the server thread """
+        async def close():
+            if self._server is not None:
+                self._server.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._loop is None:
+            return
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
+        self._loop = None
+        if isinstance(self.address, str) and self._server is not None:
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+        self._server = None
+
+class SharedBoard:
+    """
+The board of a game in shared memory (multiprocessing.shared_memory) for other processes like
+learning agents, analysis tools and test harnesses. After every tick the game writes the cell
+types (0 empty, 1 snake body, 2 snake head, 3 apple, as for the spectators), the snake head,
+length, score, apples, tick and game over. A seqlock keeps the reads consistent: the sequence
+number is odd while the game writes and a read is valid when the number was even and the same
+before and after it. A controller sends moves through a command slot, the game takes the newest
+command at the next tick.
+
+Layout (little-endian): b'WSSM', version, width, rows (<4sIII) | sequence number at 16 (<Q) |
+tick, head x, head y, length, score, apples, game over at 24 (<QiiIIIB) | command number and
+action at 64 (<QB, the action is an index of Replay.ACTIONS from 1, None is no command) | last
+command taken at 80 (<Q) | the cells at 128, one byte per cell, row by row.
+
+>>> board = SharedBoard.attach('snake')   # Snake(shared_memory='snake') is playing
+>>> state, grid = board.read()            # a consistent copy
+>>> board.grid                            # NumPy view of the cells (rows, width), no copy
+>>> board.send('w')
+    """
+    MAGIC = b'WSSM'
+    VERSION = 1
+    HEADER = struct.Struct('<4sIII') # magic, version, width, rows
+    SEQ = struct.Struct('<Q') # sequence number of the seqlock at offset 16
+    STATE = struct.Struct('<QiiIIIB') # tick, head x, head y, length, score, apples, game over at offset 24
+    COMMAND = struct.Struct('<QB') # command number, action at offset 64
+    NUMBER = struct.Struct('<Q') # the command number of COMMAND alone, a controller writes it after the action
+    ACK = struct.Struct('<Q') # command number of the last command taken by the game at offset 80
+    GRID = 128 # offset of the cells
+
+    def __init__(self, memory:shared_memory.SharedMemory, owner:bool) -> None:
+        magic, version, self.WIDTH, self.ROWS = self.HEADER.unpack_from(memory.buf, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            memory.close()
+            raise ValueError(f"The shared memory '{memory.name}' is not a WinSnake board of version {self.VERSION}")
+        self.name = memory.name # name of the shared memory
+        self._memory = memory
+        self._owner = owner # the game that writes the board
+        self._full = True # the next publish() writes every cell
+        self._command = 0 # command number of the last command taken (game) or sent (controller)
+        self.grid = (np.ndarray((self.ROWS, self.WIDTH), dtype=np.uint8, buffer=memory.buf, offset=self.GRID)
+                     if np is not None else None) # the cells without copying, None without NumPy
+
+    @classmethod
+    def create(cls, name:None|str, width:int, rows:int) -> 'SharedBoard':
+        """ Creates the shared memory of a board for the game, a free name is chosen if `name` is None """
+        memory = shared_memory.SharedMemory(name, create=True, size=cls.GRID + width*rows)
+        memory.buf[:cls.GRID] = bytes(cls.GRID)
+        cls.HEADER.pack_into(memory.buf, 0, cls.MAGIC, cls.VERSION, width, rows)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name:str) -> 'SharedBoard':
+        """ Opens the board of a game that is playing """
+        try:
+            memory = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Python < 3.13 registers the memory of this process too and would remove it on exit
+            memory = shared_memory.SharedMemory(name)
+            if os.name != 'nt':
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(memory._name, 'shared_memory')
+        return cls(memory, owner=False)
+
+    def restart(self) -> None:
+        """ Writes every cell on the next publish(), for example after a new game started """
+        self._full = True
+
+    def publish(self, state:tuple, cells, board) -> None:
+        """ Writes a tick: the STATE values, the changed cells as (cell index, type) and board() returns all cells when needed """
+        buf = self._memory.buf
+        seq = self.SEQ.unpack_from(buf, 16)[0]
+        self.SEQ.pack_into(buf, 16, seq+1) # odd: writing
+        if self._full:
+            self._full = False
+            buf[self.GRID:self.GRID + self.WIDTH*self.ROWS] = board()
+        else:
+            for cell, kind in cells:
+                buf[self.GRID + cell] = kind
+        self.STATE.pack_into(buf, 24, *state)
+        self.SEQ.pack_into(buf, 16, seq+2)
+
+    def command(self) -> None|str:
+        """ Returns the action of a new command of the controller, None if there is none """
+        number, action = self.COMMAND.unpack_from(self._memory.buf, 64)
+        if number == self._command:
+            return None
+        self._command = number
+        self.ACK.pack_into(self._memory.buf, 80, number)
+        return Replay.ACTIONS[action] if 0 < action < len(Replay.ACTIONS) else None # 0 (None) isn't a command
+
+    @property
+    def seq(self) -> int:
+        """ The sequence number of the seqlock, odd while the game writes """
+        return self.SEQ.unpack_from(self._memory.buf, 16)[0]
+
+    def read(self, timeout:float=1.0) -> tuple[dict, object]:
+        """ Returns a consistent copy of the state (a dict) and the cells (an array, bytes without NumPy), raises TimeoutError """
+        deadline = time.perf_counter() + timeout
+        buf = self._memory.buf
+        while True:
+            seq = self.SEQ.unpack_from(buf, 16)[0]
+            if not seq & 1:
+                tick, x, y, length, score, apples, done = self.STATE.unpack_from(buf, 24)
+                grid = self.grid.copy() if self.grid is not None else bytes(buf[self.GRID:self.GRID + self.WIDTH*self.ROWS])
+                if self.SEQ.unpack_from(buf, 16)[0] == seq:
+                    return {'seq': seq, 'tick': tick, 'head': (x, y), 'length': length, 'score': score, 'apples': apples,
+                            'done': bool(done)}, grid
+            if time.perf_counter() > deadline:
+                raise TimeoutError('The game is not writing the board')
+            time.sleep(0)
+
+    def wait(self, seq:int, timeout:float=1.0) -> None|int:
+        """ Waits until the game wrote a tick after the sequence number and returns the new number, None after the timeout """
+        deadline = time.perf_counter() + timeout
+        while True:
+            now = self.seq
+            if now != seq and not now & 1:
+                return now
+            if time.perf_counter() > deadline:
+                return None
+            time.sleep(0)
+
+    def send(self, action:str) -> int:
+        """ Sends an action of SnakeEngine.step() to the game ('w', 'a', 's', 'd' or '' to stop), returns the command number """
+        if action is None or action not in Replay.ACTIONS:
+            raise ValueError(f"No snake action '{action}'!")
+        self._command = max(self._command, self.COMMAND.unpack_from(self._memory.buf, 64)[0]) + 1
+        # the action first, the game only reads it after the number changed
+        self._memory.buf[72] = Replay.ACTIONS.index(action)
+        self.NUMBER.pack_into(self._memory.buf, 64, self._command)
+        return self._command
+
+    @property
+    def taken(self) -> int:
+        """ The number of the last command the game took """
+        return self.ACK.unpack_from(self._memory.buf, 80)[0]
+
+    def close(self) -> None:
+        """ Closes the board, the game also removes the shared memory """
+        self.grid = None # the view must be released before the memory is closed
+        self._memory.close()
+        if self._owner:
+            try:
+                self._memory.unlink()
+            except FileNotFoundError:
+                pass
+
+class Snake(SnakeEngine):
     """
 SNAKE GAME WITHOUT "CURSES" MODULE
 ==================================
@@ -32,8 +1954,8 @@ SNAKE GAME WITHOUT "CURSES" MODULE
 Supported Operating System (OS)
 -------------------------------
 `Windows` OS supports the `keyboard` and `msvcrt.getch` module packages.
-But operations other than the Windows environment are most likely not supported,
-especially on the library `keyboard`.
+Other operating systems (Linux, macOS) can play with `input_type='posix'`, it reads the
+keys from the terminal with `termios` and doesn't need the library `keyboard`.
 
 Required Modules
 ----------------
@@ -60,33 +1982,67 @@ Installation parameters in Snake():
 `fps`: Set the frames per second (FPS) as well as set the speed of the snake [default: 9].
 `lots_of_apples`: Regulate how many apples there are in the game [default: 20].
 `generate_new_apple`: Set whether an apple will appear or not every time the snake eats an apple [default: True].
-`set_pos_apple`: Set to adjust the alignment of the apple position [default: False].
+`set_pos_apple`: Set to adjust the alignment of the apple position, apples are only placed on free cells [default: False].
 `game_over`: Set whether the game can be game over [default: True].
-`save_high_score`: Set save the highscore in the file "SNAKE-SCORE.hi" [default: True].
+`save_high_score`: Set save the highscore of each game configuration in the file "SNAKE-SCORE.hi" [default: True].
 `show_score_board`: Set to display the scoreboard [default: True].
 `bot_mode`: Set to bot mode [default: False].
 `bot_move_type`: Set bot algorithm type [default: 'neat'].
+`bot_time_limit`: Set the maximum seconds the 'pathfinding' and 'mcts' bots may think about one move [default: 0.005].
 `bot_move_info_type`: Set to change the display type of move snake on the bottom screen [default: 'wasd'].
+`seed`: Set the seed of the random apple coordinates [default: None].
+`render_type`: Set the way the snake board is drawn on the screen [default: 'full'].
+`input_type`: Set the way the keys are read [default: 'keyboard' on Windows, else 'posix'].
+`profile`: Set to show the frame profiler line instead of the control text [default: False].
+`profile_file`: Set a file to write the frame profiler statistics on exit, CSV or JSON [default: None].
+`record_file`: Set a file to write the replay of the game on exit (see Replay) [default: None].
+`spectator_address`: Set a port on localhost or a Unix socket path to send the game to viewer.py [default: None].
+`render_fps`: Set the maximum frames per second drawn on the screen, the game still runs at `fps` [default: None, every frame].
+`view_type`: Set what is drawn of a board larger than the terminal [default: 'full'].
+`shared_memory`: Set a name to write the board to shared memory for other processes (see SharedBoard) [default: None].
 
 Types of `bot_move_type`:
   - 'neat': Make bot lanes organized and neat.
-  - 'algorithm': Using an algorithm system.
+  - 'algorithm': Go straight to the nearest apple, also around the edges of the board.
+  - 'pathfinding': Find the shortest safe path to an apple around the snake body, also in game over mode.
+  - 'mcts': Play many short random games after every move and take the best move, also in game over mode.
 
 Types of `bot_move_info_type`:
   - `wasd`: Only show ['w', 'a', 's', 'd', ''].
   - `ulds`: Only show ['Up', 'Left', 'Down', 'Right', 'Stop'].
 
+Types of `render_type`:
+  - 'full': Clear the screen and reprint the whole board every frame.
+  - 'diff': Only redraw the cells that changed since the previous frame.
+
+Types of `view_type`:
+  - 'full': Draw the whole board.
+  - 'crop': Draw the part of the board around the snake head that fits in the terminal.
+  - 'scale': Draw the whole board scaled down to the terminal, one character for a block of cells.
+
+With `render_fps` the game ticks at `fps` no matter how fast the terminal is: frames are only
+drawn while the game keeps up with its ticks, at most `render_fps` times a second and less when
+drawing takes longer than that.
+
+Types of `input_type`:
+  - 'keyboard': Poll the keys with `keyboard.is_pressed` until the next frame.
+  - 'hook': The `keyboard` module queues every key press and the game sleeps until the next frame (Windows).
+  - 'posix': A thread reads the keys from the terminal into a queue and the game sleeps until the next frame.
+
+The game logic itself runs in SnakeEngine, which can be used without terminal and keyboard
+(also outside Windows) to simulate games with step().
+
 Exit Codes
 ----------
 -2: Not yet installed the required packages
--1: If the OS used is other than Windows.
+-1: If the OS used is other than Windows (except `input_type='posix'`).
 0: Exit the game (pressing Q).
 1: Force quit the game (pressing Ctrl + (C or Z)).
 ~: Orders.
     """
     def __init__(self,
-                width             :int  = tsize('x'),
-                height            :int  = tsize('y'),
+                width             :None|int = None,
+                height            :None|int = None,
                 fps               :int  = 9,
                 lots_of_apples    :int  = 20,
                 len_snake         :int  = 1,
@@ -97,33 +2053,71 @@ Exit Codes
                 show_score_board  :bool = True,
                 bot_mode          :bool = False,
                 bot_move_type     :str  = 'neat',
-                bot_move_info_type:str  = 'wasd'
+                bot_move_info_type:str  = 'wasd',
+                bot_time_limit    :float = 0.005,
+                seed              :None|int = None,
+                render_type       :str  = 'full',
+                input_type        :None|str = None,
+                profile           :bool = False,
+                profile_file      :None|str = None,
+                record_file       :None|str = None,
+                spectator_address :None|int|str = None,
+                render_fps        :None|int = None,
+                view_type         :str  = 'full',
+                shared_memory     :None|str = None
         ) -> None:
-        if not all(isinstance(args, int) for args in (width, height, fps, lots_of_apples, len_snake)):
-            raise TypeError('Type arguments (width:{}, height:{}, fps:{}, lots_of_apples:{}, len_snake:{}) are all not int'.format(
-                type(width).__name__, type(height).__name__, type(fps).__name__, type(lots_of_apples).__name__, type(len_snake).__name__
-            ))
-        maxradius = (width-2) * (height-(4 if show_score_board else 3)) - 10
-        if (258 < width) or (width < 50) or (128 < height) or (height < 15) or (120 < fps) or (fps < 2) or (maxradius < lots_of_apples) or (lots_of_apples < 1) or (maxradius < len_snake) or (len_snake < 1):
-            raise ValueError(f'The value given is out of bounds.\nMIN, MAX:\n  width: 50, 258 - [got {width}]\n  height: 15, 128 - [got {height}]\n  fps: 2, 120 - [got {fps}]\n  lots_of_apples: 1, {maxradius} - [got {lots_of_apples}]\n  len_snake: 1, {maxradius} - [got {len_snake}]')
-        if not bot_move_type in ('neat', 'algorithm'):
-            raise TypeError(f"No bot mode with type '{bot_move_type}'!")
+        input_type = ('keyboard' if os.name == 'nt' else 'posix') if input_type is None else input_type
+        if not input_type in ('keyboard', 'hook', 'posix'):
+            raise TypeError(f"No input type with type '{input_type}'!")
+        frontend_error = _frontendError(windows=input_type != 'posix')
+        if frontend_error is not None:
+            raise (ImportError if frontend_error[0] == -2 else OSError)(frontend_error[1])
+        if input_type == 'posix' and os.name == 'nt':
+            raise OSError(f"\033[31mERROR\033[0m - THE INPUT TYPE '{input_type}' ONLY WORKS IN A POSIX ENVIRONMENT")
+        width = tsize('x') if width is None else width
+        height = (tsize('y') - (1 if profile and show_score_board else 0)) if height is None else height # the profiler line below the control text
+        if not isinstance(fps, int):
+            raise TypeError(f'Type argument fps:{type(fps).__name__} is not int')
+        if (120 < fps) or (fps < 2):
+            raise ValueError(f'The value given is out of bounds.\nMIN, MAX:\n  fps: 2, 120 - [got {fps}]')
         if not bot_move_info_type in ('wasd', 'ulds'):
             raise TypeError(f"No bot move info type with type '{bot_move_info_type}'!")
+        if not render_type in ('full', 'diff'):
+            raise TypeError(f"No render type with type '{render_type}'!")
+        if not view_type in ('full', 'crop', 'scale'):
+            raise TypeError(f"No view type with type '{view_type}'!")
+        if not (render_fps is None or isinstance(render_fps, int)):
+            raise TypeError(f'Type argument render_fps:{type(render_fps).__name__} is not int')
+        if render_fps is not None and ((120 < render_fps) or (render_fps < 1)):
+            raise ValueError(f'The value given is out of bounds.\nMIN, MAX:\n  render_fps: 1, 120 - [got {render_fps}]')
+        if not (profile_file is None or isinstance(profile_file, str)):
+            raise TypeError(f'Type argument profile_file:{type(profile_file).__name__} is not str')
+        if not (record_file is None or isinstance(record_file, str)):
+            raise TypeError(f'Type argument record_file:{type(record_file).__name__} is not str')
+        if not (spectator_address is None or isinstance(spectator_address, (int, str))):
+            raise TypeError(f'Type argument spectator_address:{type(spectator_address).__name__} is not int or str')
+        if not (shared_memory is None or isinstance(shared_memory, str)):
+            raise TypeError(f'Type argument shared_memory:{type(shared_memory).__name__} is not str')
+        if record_file is not None and seed is None:
+            # a replay can only generate the same apples with the seed
+            seed = random.randrange(2**32)
+        super().__init__(width=width, height=height, lots_of_apples=lots_of_apples, len_snake=len_snake, generate_new_apple=generate_new_apple,
+                         set_pos_apple=set_pos_apple, game_over=game_over, show_score_board=show_score_board, bot_move_type=bot_move_type,
+                         bot_time_limit=bot_time_limit, seed=seed)
 
-        self.WIDTH = width # width of display
-        self.HEIGHT = height # height of display
         self.FPS = fps # frame per seconds
-        self.LOA = lots_of_apples # the number of apples in the game
-        self.LS = len_snake # snake length for the first time
-        self.GNA = bool(generate_new_apple) # produces a new apple every time you eat one if the value is True
-        self.SPA = bool(set_pos_apple) # adjusts the alignment of the apple's position if the value is True
-        self.GO = bool(game_over) # showing game over if the value is True
         self.SHC = bool(save_high_score) # saves the highscore if the value is True
-        self.SSB = bool(show_score_board) # display scoreboard setting
         self.BM = bool(bot_mode) # game with bot moves
-        self.BMT = bot_move_type # types bot moving
         self.BMIT = bot_move_info_type # bot move info display type
+        self.RT = render_type # snake board rendering type
+        self.IT = input_type # keyboard input type
+        self.PRF = bool(profile) # shows the frame profiler line below the snake board and the control text
+        self.PRFF = profile_file # file of the frame profiler statistics written on exit
+        self.RF = record_file # replay file of the game written on exit
+        self.SA = spectator_address # port on localhost or Unix socket path of the spectator server
+        self.RFPS = render_fps # maximum frames drawn per second, None draws every frame
+        self.VT = view_type # part of the board drawn when it's larger than the terminal
+        self.SM = shared_memory # name of the shared memory of the board
 
         self.exit_code = 0
         self.running = True
@@ -135,82 +2129,118 @@ Exit Codes
             if len(rmansi(char)) != 1: raise ValueError(f'Requires at least 1 ASCII character, not {len(rmansi(char))}')
         self._message_exit = '' # showing messages exit
         self._botMovesInfo = {'w': 'Up', 'a': 'Left', 's': 'Down', 'd': 'Right', '': 'Stop'}
-        self._game_over = False # Declares whether it is game over or not
         self._ASCII_DISPLAY = [] # This is part of the main screen on the snake board
-        # snake position
-        self._posX_snake = (self.WIDTH-2) // 2
-        self._posY_snake = (self.HEIGHT-self._SSBs(4, 3)) // 2
-        # change of snake coordinates
-        self._deltaX = 0
-        self._deltaY = 0
-        self._moveSnake = '' # the direction the snake walks
-        # data section snake coordinates, snake length, and highest score
-        self._snakeList = []
-        self._lenSnake = len_snake
-        self._rmCountApple = 0
-        self._hiScore = self._highscore() if self.SHC else '-'
-         # apple coordinate data section
-        self._posApples = []
-        if self.SPA:
-            print('Create random coordinates...')
-        self._rdmPosApples(showStatus=True)
-        self._getRealTime = '-' # get the delay time and convert it to FPS in real time
-        self._getDelayFPS = time.time()
+        # board composition section, the static parts of the screen are made once by self._composeTemplates()
+        self._rowTemplates = [] # characters of every board row without snake and apples
+        self._rowBuffers = None # characters of every board row on the previous frame, None composes the whole board again
+        self._legends = {} # control text of every self._moveSnake and board width
+        self._scoreBarFormat = '' # score bar with the colors, the numbers are formatted in
+        self._composeTemplates()
+        # incremental rendering section (render_type 'diff')
+        self._fullRedraw = True # redraw the whole screen on the next frame
+        self._prevScoreBar = '' # score bar and control text drawn on the previous frame
+        self._prevControl = ''
+        self._prevProfile = ''
+        self._termSize = None # terminal size on the previous frame
+        self._viewRect = None # (view_type, first column, first row, columns, rows) drawn on the previous frame, None is the whole board
+        self._nextRender = 0.0 # time after which the next frame may be drawn (render_fps)
+        self._hiScores = HighScores() if self.SHC else None # high scores of SNAKE-SCORE.hi
+        self._hiScoreKey = self._highscoreKey()
+        self._hiScore = self._hiScores.get(self._hiScoreKey) if self.SHC else '-'
+        self._getRealTime = '-' # time of the previous frame, converted to FPS in real time
+        self._getDelayFPS = None # start time of the current frame
+        self._profileLine = '' # frame profiler line, updated once a second
+        self._replay = Replay({'width': self.WIDTH, 'height': self.HEIGHT, 'fps': self.FPS, 'lots_of_apples': self.LOA, 'len_snake': self.LS,
+                               'generate_new_apple': self.GNA, 'set_pos_apple': self.SPA, 'game_over': self.GO, 'show_score_board': self.SSB,
+                               'bot_mode': self.BM, 'bot_move_type': self.BMT, 'bot_move_info_type': self.BMIT, 'bot_time_limit': self.BTL,
+                               'seed': self.SEED}) if self.RF else None # recording of the game
+        self._server = None # SpectatorServer while the game is playing
+        self._shared = None # SharedBoard while the game is playing
+        # event input section (input_type 'hook' and 'posix')
+        self._input = None # input backend while the game is playing
+        self._moveQueue = deque(maxlen=4) # direction key presses that are not played yet, one per frame, more presses are ignored
+        self._nextFrame = time.perf_counter() # deadline of the next frame
 
     def cls(self) -> None:
-        os.system('cls') # This function is used to clean the screen
-
-    def _SSBs(self, SSB_T, SSB_F) -> object:
-        # this function is used to set the size of the coordinates which can change depending on the value of self.SSB
-        return SSB_T if self.SSB else SSB_F
+        # This function is used to clean the screen
+        if self.RT == 'diff':
+            # clear with ANSI codes instead of spawning a shell process
+            print('\033[2J\033[H', end='', flush=True)
+            self._fullRedraw = True
+        else:
+            _clearScreen()
 
     def _sleepFPS(self) -> None:
         # Sleep time in FPS form
-        current = time.time() + (1 / self.FPS - (time.time() - self._getDelayFPS))
-        while True:
-            self._move_event()
-            if current <= time.time():
-                break
+        if self._input is None and self.RFPS is None:
+            # polling the keyboard until the frame ends
+            current = time.time() + (1 / self.FPS - (time.time() - self._getDelayFPS))
+            while True:
+                self._move_event()
+                if current <= time.time():
+                    break
+            return
+        # fixed timestep, the key presses are collected by the input backend in the meantime
+        self._nextFrame += 1 / self.FPS
+        now = time.perf_counter()
+        if now - self._nextFrame > (0.5 if self.RFPS is not None else 1 / self.FPS):
+            # too late (pause, game over or a slow terminal), don't catch up. With render_fps the late
+            # frames are caught up without drawing them, so the snake keeps its speed
+            self._nextFrame = now
+            return
+        if self._input is None:
+            # polling the keyboard until the frame ends
+            while time.perf_counter() < self._nextFrame:
+                self._move_event()
+            return
+        if self._nextFrame - now > 0.002:
+            time.sleep(self._nextFrame - now - 0.001)
+        # the last millisecond is slept in small steps, time.sleep() can oversleep
+        while time.perf_counter() < self._nextFrame:
+            time.sleep(0)
 
-    def _highscore(self, new_hi_score:None|int=None) -> None|int:
-        # This function is used to get or change the highest score value in the SNAKE-SCORE.hi file
-        try:
-            with open('SNAKE-SCORE.hi', 'r+', encoding='utf8') as hi:
-                if new_hi_score == None: score = hi.read()
-                else: hi.write(new_hi_score)
-            return int(score) if score.isdigit() else self._highscore(0)
-        except:
-            try:
-                with open('SNAKE-SCORE.hi', 'w', encoding='utf8') as hie: hie.write(str(new_hi_score))
-            finally:
-                return new_hi_score
+    def _renderDue(self) -> None|float:
+        # Returns the time the drawing of this frame starts, None if the frame is not drawn (render_fps)
+        now = time.perf_counter()
+        if self.RFPS is not None:
+            if now < self._nextRender:
+                return None
+            if now > self._nextFrame + 1 / self.FPS and now < self._nextRender + 0.5:
+                # the game is behind its ticks, it catches up first unless nothing was drawn for a while
+                return None
+        return now
 
-    def _rdmPosApples(self, generated=True, showStatus=False) -> None:
-        # This function is used to provide random coordinates of where the apple is located
-        i = 0
-        rdmpos = lambda: (random.randint(1, self.WIDTH-2), random.randint(1, self.HEIGHT-self._SSBs(4, 3)))
-        if self.SPA:
-            while i < self.LOA:
-                a = rdmpos()
-                if a in self._posApples:
-                    if showStatus: print(f'{len(self._posApples)}/{self.LOA} apples left ', end='\r')
-                    continue
-                else:
-                    if generated:
-                        i += 1
-                        self._posApples.append(a)
-                    else:
-                        self._posApples.append(a)
-                        break
-        elif not self.SPA:
-            if generated:
-                for _ in range(self.LOA):
-                    self._posApples.append(rdmpos())
-            else:
-                self._posApples.append(rdmpos())
+    def _rendered(self, start:float) -> None:
+        # Sets when the next frame may be drawn, a slow terminal is given at most half of the time
+        if self.RFPS is not None:
+            self._nextRender = start + max(1 / self.RFPS, (time.perf_counter()-start) * 2)
+
+    def _getKey(self) -> str:
+        # waits for a key press and returns it in lowercase
+        if self._input is not None:
+            return self._input.getch()
+        return getch().decode('utf8', 'ignore').lower()
+
+    def _highscoreKey(self) -> str:
+        # the configuration of the game in the high score file, so that different games don't share one high score
+        return '{}x{} fps:{} apples:{} snake:{} new_apple:{} pos_apple:{} game_over:{} score_board:{} player:{}'.format(
+            self.WIDTH, self.HEIGHT, self.FPS, self.LOA, self.LS, int(self.GNA), int(self.SPA), int(self.GO), int(self.SSB), self.BMT if self.BM else 'human')
 
     def _showQuit(self) -> None:
         # displays or asks if you want to exit the game
+        self._fullRedraw = True
+        if self._input is not None:
+            self._input.suspend()
+        try:
+            self._askQuit()
+        finally:
+            if self._input is not None:
+                self._input.resume()
+            if self._profiler is not None:
+                self._profiler.skip() # the frame waited for the answer
+
+    def _askQuit(self) -> None:
+        # asks if you want to exit the game
         print()
         while True:
             quit_user = input('Are you sure want to Quit? [Y/n]: ').lower()
@@ -219,6 +2249,8 @@ Exit Codes
                     self.running = False
                     self.exit_code = 0
                     self._message_exit = 'You Quit the game. Bye, see you later.. :)'
+                    if self._replay is not None:
+                        self._replay.event('quit')
                     break
                 case 'n':
                     break
@@ -226,49 +2258,282 @@ Exit Codes
     def _showGameOver(self, message:str) -> None:
         # Displays game over on the screen
         self._game_over = True
+        if self._profiler is not None:
+            self._profiler.skip() # the frame waits for the player
+        if self.SHC:
+            self._hiScores.flush()
         def showinfo():
             self.cls()
             self._showDisplay(showControl=False)
             print(f"\n(Enter 'c' to continue) \033[31mGAME OVER\033[0m - \033[33m{message}\033[0m...", end='')
         showinfo()
         while True:
-            game_over_user = ord(getch())
-            if game_over_user in (99, 67):
+            game_over_user = self._getKey()
+            if game_over_user == 'c':
                 # reset all
-                self._snakeList.clear()
-                self._posApples.clear()
-                self._posX_snake, self._posY_snake, self._deltaX, self._deltaY, self._rmCountApple, self._lenSnake, self._moveSnake = (self.WIDTH-2)//2, (self.HEIGHT-self._SSBs(4, 3))//2, 0, 0, 0, self.LS, ''
-                if self.SPA:
-                    print('\nCreate random coordinates...')
-                self._rdmPosApples(showStatus=True)
-                self._game_over = False
+                if self._replay is not None:
+                    self._replay.event('reset')
+                if self._server is not None:
+                    self._server.restart()
+                if self._shared is not None:
+                    self._shared.restart()
+                self._setStart()
+                self._rdmPosApples()
+                self._moveQueue.clear()
                 break
-            elif game_over_user in (113, 81):
+            elif game_over_user == 'q':
                 self._showQuit()
                 if not self.running: break
                 else: showinfo()
 
-    def _showDisplay(self, showControl:bool=True) -> None:
-        # Displays the score bar and snake board on the screen
-        lensnk, fps, loa, hiscr, ct_appl = map(str, [self._lenSnake-1, self.FPS, self.LOA-self._rmCountApple, self._hiScore, len(set(self._posApples))])
-        hiscr = '-' if hiscr == 'False' else hiscr
-        real_fps = f'{1/(time.time()-self._getRealTime):.1f}' if isinstance(self._getRealTime, (int, float)) else '-'
+    def _setStart(self) -> None:
+        super()._setStart()
+        self._rowBuffers = None # the whole board changed
+
+    def _composeTemplates(self) -> None:
+        # makes the static parts of the screen: the border rows, the side border row, the score bar colors and the control texts
+        W = self.WIDTH
+        he = self.HEIGHT-self._SSBs(3, 2)
+        side = ['\u2503'] + [self.ASCII[3]]*(W-2) + ['\u2503']
+        self._rowTemplates = ([['\u250f'] + ['\u2501']*(W-2) + ['\u2513']]
+                             +[side]*(he-1)
+                             +[['\u2517'] + ['\u2501']*(W-2) + ['\u251b']])
+        self._rowBuffers = None
+        self._legends = {}
+        self._scoreBarFormat = (f'{rgb()}SCORE: {rgb(20,225,100)}{{}}{rgb()}/{rgb(225,100,20)}{{}}{rgb()}'
+                               +f'  FPS: {rgb(127,127,127)}{{}}/{{}}{rgb()}'
+                               +f'  APPLES: {rgb(200,0,0)}{{}}/{{}}{rgb()}')
+
+    def _scoreBar(self) -> str:
+        # Returns the score bar text that is displayed above the snake board
+        real_fps = f'{1/self._getRealTime:.1f}' if isinstance(self._getRealTime, float) and self._getRealTime > 0 else '-'
+        return self._scoreBarFormat.format(self._lenSnake-1, self._hiScore, real_fps, self.FPS, len(self._posApples), self.LOA-self._rmCountApple)
+
+    def _controlInfo(self) -> str:
+        # Returns the control text that is displayed below the snake board
+        key = (self._moveSnake, self._screenWidth())
+        legend = self._legends.get(key)
+        if legend is None:
+            legend = self._legends[key] = self._legend()
+        return legend
+
+    def _profileInfo(self) -> str:
+        # Returns the frame profiler line that is displayed below the snake board and the control text, updated once a second
+        if not self._profileLine or self._profiler.frames % self.FPS == 0:
+            self._profileLine = self._profiler.overlay()[:self._screenWidth()]
+        return f'{rgb(127,127,127)}{self._profileLine}\033[0m'
+
+    def _screenWidth(self) -> int:
+        # Returns the width of the drawn board, smaller than self.WIDTH with a view (view_type)
+        return self.WIDTH if self._viewRect is None else self._viewRect[3]
+
+    def _legend(self) -> str:
+        # Returns the control text of the current move of the snake
         showSM = {
             'w': ('\033[32mw\033[0m' if self._moveSnake=='w' else 'w'),
             'a': ('\033[32ma\033[0m' if self._moveSnake=='a' else 'a'),
             's': ('\033[32ms\033[0m' if self._moveSnake=='s' else 's'),
             'd': ('\033[32md\033[0m' if self._moveSnake=='d' else 'd'),
         }
+        if not self.BM:
+            if self._screenWidth() >= 60:
+                moves = '[{}]:\033[35mUp\033[0m  [{}]:\033[35mDown\033[0m  [{}]:\033[35mLeft\033[0m  [{}]:\033[35mRight\033[0m'.format(showSM['w'],showSM['s'],showSM['a'],showSM['d'])
+            else:
+                moves = '[{}{}{}{}]: \033[35mMoves Snake\033[0m'.format(showSM['w'],showSM['a'],showSM['s'],showSM['d'])
+        else:
+            moves = 'Bot move: [\033[32m{}\033[0m]'.format(self._moveSnake if self.BMIT == 'wasd' else self._botMovesInfo[self._moveSnake])
+        return justify(moves+'  [p]:\033[35mPause\033[0m  [q]:\033[35mQuit\033[0m', self._screenWidth(), wrap=False)
+
+    def _showDisplay(self, showControl:bool=True) -> None:
+        # Displays the score bar and snake board on the screen
+        if self.RT == 'diff':
+            # the board is not composed every frame in this mode
+            self._renderBoard()
         print(
-            (f'{rgb()}SCORE: {rgb(20,225,100)+lensnk+rgb()}/{rgb(225,100,20)+hiscr+rgb()}'
-            +f'  FPS: {rgb(127,127,127)+real_fps}/{fps+rgb()}'
-            +f'  APPLES: {rgb(200,0,0)+ct_appl}/{loa+rgb()}\n' if self.SSB else '')
-            +'\n'.join([row for row in self._ASCII_DISPLAY])
-            +('\n'+justify(f"{('[{}]:\033[35mUp\033[0m  [{}]:\033[35mDown\033[0m  [{}]:\033[35mLeft\033[0m  [{}]:\033[35mRight\033[0m'.format(showSM['w'],showSM['s'],showSM['a'],showSM['d']) if self.WIDTH >= 60 else '[{}{}{}{}]: \033[35mMoves Snake\033[0m'.format(showSM['w'],showSM['a'],showSM['s'],showSM['d'])) if not self.BM else f'Bot move: [\033[32m{self._moveSnake if self.BMIT == 'wasd' else self._botMovesInfo[self._moveSnake]}\033[0m]'}  [p]:\033[35mPause\033[0m  [q]:\033[35mQuit\033[0m", self.WIDTH, wrap=False) if self.SSB and showControl else '')
+            (self._scoreBar()+'\n' if self.SSB else '')
+            +'\n'.join(self._ASCII_DISPLAY)
+            +('\n'+self._controlInfo() if self.SSB and showControl else '')
+            +('\n'+self._profileInfo() if self.PRF and showControl else '')
         ,end='')
 
+    def _showDiff(self) -> None:
+        # Displays only the parts of the screen that changed since the previous frame
+        size = (tsize('x'), tsize('y'))
+        if self._fullRedraw or size != self._termSize or self._viewRect is not None:
+            if self._fullRedraw or size != self._termSize:
+                # resize, pause or game over: redraw the whole screen
+                self._termSize = size
+                print('\033[?25l\033[2J\033[H', end='')
+            else:
+                # the view (view_type) moves or is scaled, it's drawn again over the previous one
+                print('\033[H', end='')
+            self._showDisplay()
+            self._fullRedraw = False
+            self._dirtyCells.clear()
+            self._prevScoreBar = self._scoreBar() if self.SSB else ''
+            self._prevControl = self._controlInfo() if self.SSB else ''
+            self._prevProfile = self._profileInfo() if self.PRF else ''
+            print(end='', flush=True)
+            return
+        top = 2 if self.SSB else 1 # terminal row of the first board row
+        he = self.HEIGHT-self._SSBs(3, 2)
+        out = []
+        for col, row in self._dirtyCells:
+            if 0 <= col < self.WIDTH and 0 <= row <= he:
+                out.append(f'\033[{row+top};{col+1}H{self._cellChar(col, row)}')
+        self._dirtyCells.clear()
+        if self.SSB:
+            scoreBar = self._scoreBar()
+            if scoreBar != self._prevScoreBar:
+                out.append(f'\033[1;1H{scoreBar}\033[K')
+                self._prevScoreBar = scoreBar
+            control = self._controlInfo()
+            if control != self._prevControl:
+                out.append(f'\033[{he+top+1};1H{control}\033[K')
+                self._prevControl = control
+        if self.PRF:
+            profile = self._profileInfo()
+            if profile != self._prevProfile:
+                out.append(f'\033[{he+top+(2 if self.SSB else 1)};1H{profile}\033[K')
+                self._prevProfile = profile
+        print(''.join(out), end='', flush=True)
+
+    def _cellChar(self, col:int, row:int) -> str:
+        # Returns the character of a single cell on the snake board
+        if self._snakeGrid[row*self.WIDTH+col]:
+            return self.ASCII[0] if (col, row) == self._snakeList[-1] else self.ASCII[1]
+        elif (col, row) in self._posApples:
+            return self.ASCII[2]
+        return self._rowTemplates[row][col]
+
+    def _cellType(self, col:int, row:int) -> int:
+        # Returns the type of a single cell for the spectators: 0 empty, 1 snake body, 2 snake head, 3 apple
+        if self._snakeGrid[row*self.WIDTH+col]:
+            return 2 if (col, row) == self._snakeList[-1] else 1
+        return 3 if (col, row) in self._posApples else 0
+
+    def _spectatorScore(self) -> list:
+        # score, high score, apples and apples left
+        return [self._lenSnake-1, self._hiScore, len(self._posApples), self.LOA-self._rmCountApple]
+
+    def _spectatorDelta(self, done:bool) -> bytes:
+        # Returns the message of the tick for the spectators: the cells that changed in the tick
+        rows = self.HEIGHT-self._SSBs(2, 1)
+        message = {'t': self._tick, 'c': [[col, row, self._cellType(col, row)] for col, row in self._dirtyCells
+                                          if 0 <= col < self.WIDTH and 0 <= row < rows], 's': self._spectatorScore()}
+        if done:
+            message['o'] = self._gameOverMessage
+        return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf8')
+
+    def _spectatorKeyframe(self) -> bytes:
+        # Returns the whole board for the spectators: the size and every cell with snake or apple
+        cells = {pos: 3 for pos in self._posApples}
+        cells.update((pos, 1) for pos in self._snakeList)
+        if self._snakeList:
+            cells[self._snakeList[-1]] = 2
+        message = {'k': [self.WIDTH, self.HEIGHT-self._SSBs(2, 1)], 't': self._tick, 'c': [[col, row, kind] for (col, row), kind in cells.items()],
+                   's': self._spectatorScore()}
+        return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf8')
+
+    def _sharedState(self, done:bool) -> tuple:
+        # the STATE values of SharedBoard
+        return (self._tick, self._posX_snake, self._posY_snake, self._lenSnake, self._lenSnake-1, len(self._posApples), done)
+
+    def _sharedCells(self) -> list[tuple[int]]:
+        # the cells that changed in the tick as (cell index, type) for SharedBoard
+        rows = self.HEIGHT-self._SSBs(2, 1)
+        return [(row*self.WIDTH + col, self._cellType(col, row)) for col, row in self._dirtyCells if 0 <= col < self.WIDTH and 0 <= row < rows]
+
+    def _sharedBoard(self) -> bytearray:
+        # the types of all cells for SharedBoard
+        board = bytearray(self.WIDTH * (self.HEIGHT-self._SSBs(2, 1)))
+        for col, row in self._posApples:
+            board[row*self.WIDTH + col] = 3
+        for col, row in self._snakeList:
+            board[row*self.WIDTH + col] = 1
+        if self._snakeList:
+            col, row = self._snakeList[-1]
+            board[row*self.WIDTH + col] = 2
+        return board
+
+    def _renderBoard(self) -> None:
+        # Snake board rendering process
+        W = self.WIDTH
+        rows = self._rowBuffers
+        view = self._viewArea()
+        if rows is None or self.RT == 'diff':
+            # copy the rows of the static board and put the apples and the snake on them
+            rows = self._rowBuffers = [template[:] for template in self._rowTemplates]
+            for col, row in self._posApples:
+                rows[row][col] = self.ASCII[2]
+            for col, row in self._snakeList:
+                rows[row][col] = self.ASCII[1]
+            if self._snakeList:
+                col, row = self._snakeList[-1]
+                rows[row][col] = self.ASCII[0]
+            if view is None:
+                self._ASCII_DISPLAY[:] = [''.join(chars) for chars in rows]
+        else:
+            # only the cells that changed since the previous frame
+            changed = set()
+            for col, row in self._dirtyCells:
+                if 0 <= col < W and 0 <= row < len(rows):
+                    rows[row][col] = self._cellChar(col, row)
+                    changed.add(row)
+            if view is None and self._viewRect is not None:
+                # the terminal is large enough again, the display rows were the view
+                self._ASCII_DISPLAY[:] = [''.join(chars) for chars in rows]
+            elif view is None:
+                for row in changed:
+                    self._ASCII_DISPLAY[row] = ''.join(rows[row])
+        if view is not None:
+            self._ASCII_DISPLAY[:] = self._viewRows(view)
+        self._viewRect = view
+        if self.RT == 'full':
+            self._dirtyCells.clear()
+
+    def _viewArea(self) -> None|tuple:
+        # Returns the part of the board that is drawn (view_type), None if the whole board fits in the terminal:
+        # ('crop', first column, first row, columns, rows) or ('scale', block width, block height, columns, rows)
+        if self.VT == 'full':
+            return None
+        W = self.WIDTH
+        rows = self.HEIGHT-self._SSBs(2, 1)
+        cols, lines = tsize('x'), tsize('y')-self._SSBs(2, 1)-(1 if self.PRF and self.SSB else 0)
+        if W <= cols and rows <= lines:
+            return None
+        cols, lines = max(3, min(cols, W)), max(3, min(lines, rows))
+        if self.VT == 'crop':
+            # the view follows the snake head and stops at the edges of the board
+            col, row = self._snakeList[-1] if self._snakeList else (W//2, rows//2)
+            return ('crop', min(max(col-cols//2, 0), W-cols), min(max(row-lines//2, 0), rows-lines), cols, lines)
+        sx, sy = -(-W//cols), -(-rows//lines)
+        return ('scale', sx, sy, -(-W//sx), -(-rows//sy))
+
+    def _viewRows(self, view:tuple) -> list[str]:
+        # Returns the display rows of the part of the board given by self._viewArea()
+        kind, a, b, cols, lines = view
+        if kind == 'crop':
+            return [''.join(chars[a:a+cols]) for chars in self._rowBuffers[b:b+lines]]
+        # one character for every block of cells, the snake head over its body over the apples over the board
+        side = ['\u2503'] + [self.ASCII[3]]*(cols-2) + ['\u2503']
+        grid = ([['\u250f'] + ['\u2501']*(cols-2) + ['\u2513']]
+               +[side[:] for _ in range(lines-2)]
+               +[['\u2517'] + ['\u2501']*(cols-2) + ['\u251b']])
+        for col, row in self._posApples:
+            grid[row//b][col//a] = self.ASCII[2]
+        for col, row in self._snakeList:
+            grid[row//b][col//a] = self.ASCII[1]
+        if self._snakeList:
+            col, row = self._snakeList[-1]
+            grid[row//b][col//a] = self.ASCII[0]
+        return [''.join(chars) for chars in grid]
+
     def _move_event(self) -> None:
         # get user keyboard input
+        if self._input is not None:
+            self._key_event()
+            return
         if not self.BM:
             if ispress('w'):
                 self._moveSnake = 'w'
@@ -279,166 +2544,204 @@ Exit Codes
             elif ispress('d'):
                 self._moveSnake = 'd'
         if ispress('p'):
-            def showinfo():
-                self.cls()
-                self._showDisplay(showControl=False)
-                print("\n(Enter 'c' to continue) \033[33mGAME PAUSE\033[0m...", end='')
-            showinfo()
-            # pause loop
-            while True:
-                pause_user = ord(getch())
-                if pause_user in (99, 67):
-                    self._moveSnake = ''
-                    break
-                elif pause_user in (113, 81):
-                    self._showQuit()
-                    if not self.running: break
-                    else: showinfo()
-
+            self._showPause()
         elif ispress('q'):
             self._showQuit()
 
+    def _key_event(self) -> None:
+        # get user keyboard input from the input backend, every direction key press is played on its own frame
+        for key in self._input.keys():
+            if key in ('w', 'a', 's', 'd'):
+                last = self._moveQueue[-1] if self._moveQueue else self._moveSnake
+                if not self.BM and key != last and len(self._moveQueue) < self._moveQueue.maxlen:
+                    self._moveQueue.append(key)
+            elif key == 'p':
+                self._showPause()
+            elif key == 'q':
+                self._showQuit()
+            elif key == '\x04':
+                # Ctrl + D, the end of the input
+                raise EOFError
+            if not self.running:
+                return
+        if self._moveQueue:
+            self._moveSnake = self._moveQueue.popleft()
+
+    def _showPause(self) -> None:
+        # Displays the pause screen and waits until the game continues
+        def showinfo():
+            self.cls()
+            self._showDisplay(showControl=False)
+            print("\n(Enter 'c' to continue) \033[33mGAME PAUSE\033[0m...", end='')
+        if self._replay is not None:
+            self._replay.event('pause')
+        if self._profiler is not None:
+            self._profiler.skip() # the frame waits for the player
+        showinfo()
+        # pause loop
+        while True:
+            pause_user = self._getKey()
+            if pause_user == 'c':
+                if self._replay is not None:
+                    self._replay.event('continue')
+                self._moveSnake = ''
+                self._moveQueue.clear()
+                break
+            elif pause_user == 'q':
+                self._showQuit()
+                if not self.running: break
+                else: showinfo()
+
     def _play_bot(self) -> None:
         """ BOT algorithm for playing snake """
-        if self.GO:
+        if self.GO and self.BMT not in ('pathfinding', 'mcts'):
             # Algorithm for game over mode
-            errmes = 'We apologize, currently our bot still supports non-game over mode.'
+            errmes = "We apologize, only the 'pathfinding' and 'mcts' bots support game over mode."
             input(f'\n{errmes}\n[Press ENTER to continue] OK...')
             self.running = False
             self.exit_code = 2
             self._message_exit = errmes
 
         else:
-            # Algorithm for non-game over mode
-            def find_nearest_apple() -> tuple[int]:
-                """ Find the nearest apple coordinates using Euclidean distance """
-                min_distance = float('inf')
-                nearest_apple = None
-                for apple in self._posApples:
-                    distance = math.sqrt((self._posX_snake - apple[0])**2 + (self._posY_snake - apple[1])**2)
-                    if distance < min_distance:
-                        min_distance = distance
-                        nearest_apple = apple
-                return nearest_apple
-
-            match self.BMT:
-                case 'neat':
-                    if self._posApples:
-                        if self._moveSnake in ('w', 'a', 's', '') and self._posX_snake < self.WIDTH-2: self._moveSnake = 'd'
-                        if self._posX_snake == self.WIDTH-2:
-                            if self._moveSnake == 'w': self._moveSnake = 'd'
-                            else: self._moveSnake = 'w'
-                    else: self._moveSnake = ''
-
-                case 'algorithm':
-                    near_apple = find_nearest_apple()
-                    if near_apple:
-                        if near_apple[0] < self._posX_snake: self._moveSnake = 'a'
-                        elif near_apple[0] > self._posX_snake: self._moveSnake = 'd'
-                        elif near_apple[1] < self._posY_snake: self._moveSnake = 'w'
-                        elif near_apple[1] > self._posY_snake: self._moveSnake = 's'
-                    else: self._moveSnake = ''
+            self._moveSnake = self.bot_action()
 
     def play(self) -> int:
         # changes all value on self.ASCII to str
         self.ASCII = [str(char) for char in self.ASCII]
+        self._composeTemplates()
         # title
-        os.system('title Snake Game')
-        while self.running:
-            try:
-                self._getDelayFPS = time.time()
-                # delete the position of the apple that was in the snake the first time it was there
-                if self._lenSnake == 1 and self.GO:
-                    poscenter = ((self.WIDTH-2) // 2, (self.HEIGHT-self._SSBs(3, 2)) // 2)
-                    for _ in range(self._posApples.count(poscenter)):
-                        self._rmCountApple += 1
-                        self._posApples.remove(poscenter)
-                # Check whether the position of the snake is the same as the position of one of the apples. If so, it will delete the coordinates of the apple eaten by the snake and add 1 apple randomly if self.GNA is True value..
-                if (self._posX_snake, self._posY_snake) in self._posApples:
-                    self._posApples.remove((self._posX_snake, self._posY_snake))
-                    if self.GNA:
-                        self._rdmPosApples(generated=False)
-                    self._lenSnake += 1
-
-                self._posX_snake += self._deltaX
-                self._posY_snake += self._deltaY
-                # check whether the position of the snake is outside the limits of the snake board. If yes then game over
-                if self._posX_snake < 0 or self._posX_snake > self.WIDTH-1 or self._posY_snake < 0 or self._posY_snake > self.HEIGHT-self._SSBs(3, 2):
-                    if not self.GO:
-                        self._posX_snake = (self._posX_snake + self.WIDTH) % (self.WIDTH)
-                        self._posY_snake = (self._posY_snake + self.HEIGHT-self._SSBs(2, 1)) % (self.HEIGHT-self._SSBs(2, 1))
-                    else:
-                        self._showGameOver("BOARD EXIT")
-                # clear all objects display
-                if not self._game_over:
-                    self._ASCII_DISPLAY.clear()
-
-                snakeHead = (self._posX_snake, self._posY_snake)
-                self._snakeList.append(snakeHead)
-                # Remove the tail from the snake so it looks as if the snake is moving
-                if len(self._snakeList) > self._lenSnake:
-                    del self._snakeList[0]
-                # Snake board rendering process
-                for row in range(self.HEIGHT-self._SSBs(2, 1)):
-                    colchard = ''
-                    he = self.HEIGHT-self._SSBs(3, 2)
-                    for col in range(self.WIDTH):
-                        coordinat = (col, row)
-                        if coordinat in self._snakeList:
-                            colchard += self.ASCII[0] if coordinat == self._snakeList[-1] else self.ASCII[1]
-                        elif coordinat in self._posApples:
-                            colchard += self.ASCII[2]
-                        elif coordinat == (0, 0):
-                            colchard += '\u250f'
-                        elif coordinat == (self.WIDTH-1, 0):
-                            colchard += '\u2513'
-                        elif coordinat == (0, he):
-                            colchard += '\u2517'
-                        elif coordinat == (self.WIDTH-1, he):
-                            colchard += '\u251b'
-                        elif coordinat in [(0, row), (self.WIDTH-1, row)]:
-                            colchard += '\u2503'
-                        elif coordinat in [(col, 0), (col, he)]:
-                            colchard += '\u2501'
+        if os.name == 'nt':
+            os.system('title Snake Game')
+        try:
+            # the outputs first and the input backend last, the finally below undoes whatever was started
+            if self.SA is not None:
+                self._server = SpectatorServer(self.SA)
+                self._server.start()
+            if self.SM is not None:
+                self._shared = SharedBoard.create(self.SM, self.WIDTH, self.HEIGHT-self._SSBs(2, 1))
+            if self.PRF or self.PRFF:
+                self._profiler = FrameProfiler()
+            if self.IT != 'keyboard':
+                self._input = HookInput() if self.IT == 'hook' else PosixInput()
+                self._input.start()
+            self._nextFrame = time.perf_counter()
+            while self.running:
+                try:
+                    now = time.time()
+                    profiler = self._profiler
+                    if self._getDelayFPS is not None:
+                        # the previous frame lasted from its start until now
+                        self._getRealTime = now - self._getDelayFPS
+                        if profiler is not None:
+                            # the input and sleep of the previous frame
+                            profiler.mark('sleep')
+                            profiler.frame()
+                    self._getDelayFPS = now
+                    if self._input is not None:
+                        # the keys pressed while the previous frame slept are played in this tick
+                        self._key_event()
+                        if not self.running:
+                            break
+                    # the game tick, an empty move of the keys only stops the snake in bot mode
+                    action = self._moveSnake if self._moveSnake or self.BM else None
+                    if self._shared is not None:
+                        # a move of the controller process is played as it is, '' stops the snake
+                        command = self._shared.command()
+                        if command is not None:
+                            self._moveSnake = action = command
+                    if profiler is not None: profiler.mark('sleep')
+                    _, _, done = self.step(action)
+                    if profiler is not None: profiler.mark('move')
+                    if self._replay is not None:
+                        self._replay.action(action)
+                    if self._server is not None and self._server.clients:
+                        self._server.publish(self._spectatorDelta(done), self._spectatorKeyframe)
+                    if self._shared is not None:
+                        self._shared.publish(self._sharedState(done), self._sharedCells(), self._sharedBoard)
+                    if profiler is not None: profiler.mark('publish')
+                    # Snake board rendering process
+                    render = self._renderDue()
+                    if self.RT == 'full' and render is not None:
+                        self._renderBoard()
+                        if profiler is not None: profiler.mark('board')
+                    if self.SHC:
+                        # Checks whether the score is greater than the high score, the file is written behind
+                        if self._hiScore < self._lenSnake-1:
+                            self._hiScore = self._hiScores.update(self._hiScoreKey, self._lenSnake-1)
+                        self._hiScores.flush(force=False)
+                        if profiler is not None: profiler.mark('score')
+                    # the snake exits the board or hits its own body
+                    if done:
+                        self._showGameOver(self._gameOverMessage)
+                        continue
+                    # TUI display and control section
+                    if render is not None:
+                        if self.RT == 'diff':
+                            self._showDiff()
                         else:
-                            colchard += self.ASCII[3]
-                    self._ASCII_DISPLAY.append(colchard)
-                if self.SHC:
-                    # update high score
-                    self._hiScore = self._highscore()
-                    # Checks whether the score is greater than the high score
-                    if (self._hiScore if isinstance(self._hiScore, int) else 0) < self._lenSnake-1:
-                        self._hiScore = self._highscore(self._lenSnake-1)
-                # check whether the snake's position hits any part of the snake's body. If yes then game over
-                if snakeHead in self._snakeList[:-1] and len(self._snakeList) > self.LS and self.GO:
-                    self._showGameOver("CRASHING")
-                # TUI display and control section
-                self.cls()
-                self._showDisplay()
-                if self.BM:
-                    self._play_bot()
-                self._move_event()
-                # snake movement selection process
-                delta_move = {'w': (0, -1), 'a': (-1, 0), 's': (0, 1), 'd': (1, 0)}
-                if self._moveSnake in delta_move:
-                    self._deltaX, self._deltaY = delta_move[self._moveSnake]
-                elif self._moveSnake == '' and self.BM:
-                    self._deltaX, self._deltaY = (0, 0)
-                self._getRealTime = time.time()
-                # sleep
-                self._sleepFPS()
-
-            except (KeyboardInterrupt, EOFError):
-                self.exit_code = 1
-                self._message_exit = 'You pressing Ctrl + (C or Z)..'
-                self.running = False
+                            self.cls()
+                            self._showDisplay()
+                        self._rendered(render)
+                        if profiler is not None: profiler.mark('display')
+                    if self.BM:
+                        self._play_bot()
+                        if profiler is not None: profiler.mark('bot')
+                    if self._input is None:
+                        self._move_event()
+                    # sleep
+                    self._sleepFPS()
+
+                except (KeyboardInterrupt, EOFError):
+                    self.exit_code = 1
+                    self._message_exit = 'You pressing Ctrl + (C or Z)..'
+                    self.running = False
+        finally:
+            if self._input is not None:
+                self._input.stop()
+                self._input = None
+            if self._server is not None:
+                self._server.stop()
+                self._server = None
+            if self._shared is not None:
+                self._shared.close()
+                self._shared = None
+            if self.PRFF and self._profiler is not None:
+                try:
+                    self._profiler.dump(self.PRFF)
+                except OSError as e:
+                    self._message_exit += f' (The profile file is not written: {e})'
+            if self.RF:
+                try:
+                    self._replay.save(self.RF)
+                except OSError as e:
+                    self._message_exit += f' (The replay file is not written: {e})'
+            # write the new high score before leaving the game
+            if self.SHC:
+                self._hiScores.flush()
         self.cls()
+        if self.RT == 'diff':
+            print('\033[?25h', end='') # show the cursor again
         if "WINSNAKE_HIDE_EXIT_INFO" not in os.environ:
             print('\033[0mExit - Exit code: \033[33m{}\033[0m\nWinSnake: \033[36m{}\033[0m'.format(self.exit_code, self._message_exit))
         return self.exit_code
 
+    def show_replay(self, replay:Replay, ticks) -> None:
+        """ Plays the replay again on this game without sleeping and displays the snake board after the given ticks """
+        self.ASCII = [str(char) for char in self.ASCII]
+        self._composeTemplates()
+        for tick, _ in replay.frames(ticks, engine=self):
+            self._renderBoard()
+            print(f'\033[0mTICK: \033[33m{tick}\033[0m/{replay.ticks}')
+            self._showDisplay(showControl=False)
+            print()
+
 if __name__ == '__main__':
-    os.system('cls')
+    frontend_error = _frontendError(windows=False)
+    if frontend_error is not None:
+        print(frontend_error[1])
+        print(f'Exit - Exit code: \033[31m{frontend_error[0]}\033[0m')
+        exit(frontend_error[0])
+    _clearScreen()
     while True:
         print(
             "=" * 50
@@ -459,7 +2762,7 @@ if __name__ == '__main__':
             bm   = input('Bot mode           (\033[32mbool\033[0m): ')
             if bm:
                 bmit = input('\nType moving bot show:\n  1: wasd\n  2: ulds\n[\033[36mCHOOSE\033[0m] > ')
-                bmt  = input('\nBot move type:\n  1: neat\n  2: algorithm\n[\033[36mCHOOSE\033[0m] > ')
+                bmt  = input('\nBot move type:\n  1: neat\n  2: algorithm\n  3: pathfinding\n  4: mcts\n[\033[36mCHOOSE\033[0m] > ')
             else:
                 bmit, bmt = '1', '1'
             game_snake = Snake(width              = int(w) if w.isdigit() else tsize('x'),
@@ -478,14 +2781,16 @@ if __name__ == '__main__':
                                                         .replace('2', 'ulds') if bmit in ('1', '2') else 'wasd',
                                bot_move_type      = bmt
                                                        .replace('1', 'neat')
-                                                       .replace('2', 'algorithm') if bmt in ('1', '2') else 'neat'
+                                                       .replace('2', 'algorithm')
+                                                       .replace('3', 'pathfinding')
+                                                       .replace('4', 'mcts') if bmt in ('1', '2', '3', '4') else 'neat'
                             )
             game_snake.play()
             del w, h, fps, loa, gna, spa, go, shc, ssb, bm, bmt, game_snake
         except (KeyboardInterrupt, EOFError):
             print('\n\033[33mExit [Any] or Reset config [R]...\033[0m',end='')
-            keyexit = ord(getch())
-            if keyexit in (114, 82):
+            keyexit = getch().decode('utf8', 'ignore').lower()
+            if keyexit == 'r':
                 print('\n')
                 continue
             else:
@@ -0,0 +1,56 @@
+"""
+Copyright (C) 2024
+pywinsnake - WinSnake bot arena
+
+github: AzzamMuhyala - https://github.com/azzammuhyala
+"""
+import sys, time, json, argparse
+from WinSnake import SnakeArena
+
+def run(snakes:int, ticks:int=1000, seed:int=0, **config) -> dict:
+    """ Plays `ticks` ticks of an arena with the bots and returns its timings (see SnakeArena.timings()) and the speed """
+    arena = SnakeArena(snakes, seed=seed, **config)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        arena.step()
+    seconds = time.perf_counter()-start
+    timings = arena.timings()
+    timings.update({'config': dict(config, snakes=snakes, seed=seed), 'seconds': seconds, 'ticks_per_sec': ticks/seconds,
+                    'best_score': max(arena._scores)})
+    return timings
+
+if __name__ == '__main__':
+    size = lambda text: tuple(int(value) for value in text.lower().split('x'))
+    parser = argparse.ArgumentParser(description='Plays many WinSnake bots on one board and shows the time of the ticks for every number of snakes.')
+    parser.add_argument('--snakes', nargs='+', type=int, default=[50, 100, 200, 400, 800], help='numbers of snakes to play (default: 50 100 200 400 800)')
+    parser.add_argument('--size', type=size, default=(258, 128), help='board size WIDTHxHEIGHT (default: 258x128)')
+    parser.add_argument('--apples', type=int, default=500, help='lots_of_apples (default: 500)')
+    parser.add_argument('--len-snake', type=int, default=3, help='len_snake (default: 3)')
+    parser.add_argument('--bot', default='greedy', help="bot_move_type: 'greedy' or 'random' (default: greedy)")
+    parser.add_argument('--game-over', type=int, default=1, help='game_over 0 or 1 (default: 1)')
+    parser.add_argument('--no-respawn', action='store_true', help="don't place dead snakes again")
+    parser.add_argument('--ticks', type=int, default=1000, help='ticks of every arena (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generator (default: 0)')
+    parser.add_argument('--output', help='write the timings to this JSON file')
+    args = parser.parse_args()
+
+    config = {'width': args.size[0], 'height': args.size[1], 'lots_of_apples': args.apples, 'len_snake': args.len_snake,
+              'bot_move_type': args.bot, 'game_over': bool(args.game_over), 'respawn': not args.no_respawn}
+    results = []
+    try:
+        for snakes in args.snakes:
+            result = run(snakes, args.ticks, args.seed, **config)
+            results.append(result)
+            phases = {phase['phase']: phase for phase in result['phases']}
+            frame = phases.pop('frame')
+            print(f"{snakes:>5} snakes  {result['ticks_per_sec']:>8.1f} ticks/s  tick p50 {frame['p50_ms']:.3f}  p95 {frame['p95_ms']:.3f} ms  "
+                  f"{frame['p50_ms']*1000/snakes:.2f} us/snake  on board:{result['snakes']}  best score:{result['best_score']}\n"
+                  f"      p95 ms " + '  '.join(f"{phase}:{stat['p95_ms']:.3f}" for phase, stat in phases.items())
+                  + '  deaths ' + ' '.join(f'{reason}:{count}' for reason, count in sorted(result['deaths'].items())), flush=True)
+    except KeyboardInterrupt:
+        print('Stopped.')
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as file:
+            json.dump(results, file, indent=1)
+    if not results:
+        sys.exit(1)
@@ -0,0 +1,198 @@
+"""
+Copyright (C) 2024
+pywinsnake - WinSnake benchmark
+
+github: AzzamMuhyala - https://github.com/azzammuhyala
+"""
+import sys, io, time, math, json, platform, argparse, contextlib
+from WinSnake import SnakeEngine, SnakeArena, Snake, _frontendError
+
+BOARDS = ((50, 15), (80, 24), (160, 64), (258, 128)) # width and height of the benchmarked boards
+
+def _summary(name:str, config:dict, times:list[float], seconds:float) -> dict:
+    # returns the result of a benchmark from the times of every tick in seconds
+    times = sorted(times)
+    percentile = lambda percent: times[max(0, math.ceil(percent/100*len(times))-1)]*1000 if times else 0.0
+    return {'name': name, 'config': config, 'ticks': len(times), 'seconds': seconds,
+            'ticks_per_sec': len(times)/seconds if seconds else 0.0,
+            'p50_ms': percentile(50), 'p95_ms': percentile(95), 'p99_ms': percentile(99)}
+
+def _timed(name:str, config:dict, tick, ticks:int, budget:float) -> dict:
+    # calls tick() `ticks` times or until `budget` seconds have passed (at least 5 times) and times every call
+    times = []
+    start = time.perf_counter()
+    for i in range(ticks):
+        begin = time.perf_counter()
+        tick()
+        times.append(time.perf_counter()-begin)
+        if i >= 4 and begin - start > budget:
+            break
+    return _summary(name, config, times, time.perf_counter()-start)
+
+def _cycleAction(engine:SnakeEngine) -> str:
+    # the next move on a cycle through every board cell, so a long snake never hits itself:
+    # rows from left to right and back, column 0 goes back up to the first row (the number of rows must be even)
+    x, y = engine._posX_snake, engine._posY_snake
+    if x == 0:
+        return 'w' if y > 0 else 'd'
+    if y % 2 == 0:
+        return 'd' if x < engine.WIDTH-1 else 's'
+    if x > 1:
+        return 'a'
+    return 's' if y < engine.HEIGHT-engine._SSBs(3, 2) else 'a'
+
+def bench_render(seed:int, ticks:int, budget:float) -> list[dict]:
+    """ Board composition (_renderBoard) and screen output (_showDisplay) of the Snake frontend on every board size """
+    frontend_error = _frontendError(windows=False)
+    if frontend_error is not None:
+        return [{'name': 'render', 'skipped': frontend_error[1]}]
+    results = []
+    screen = io.StringIO() # the terminal, everything printed is thrown away
+    for width, height in BOARDS:
+        config = {'width': width, 'height': height, 'lots_of_apples': 20, 'game_over': False}
+        game = Snake(save_high_score=False, bot_mode=True, seed=seed, **config)
+        def compose():
+            game.step(game.bot_action())
+            game._renderBoard()
+        def frame():
+            compose()
+            with contextlib.redirect_stdout(screen):
+                game._showDisplay()
+            screen.seek(0)
+            screen.truncate()
+        results.append(_timed(f'render compose {width}x{height}', config, compose, ticks, budget))
+        results.append(_timed(f'render frame {width}x{height}', config, frame, ticks, budget))
+    return results
+
+def bench_apples(seed:int, ticks:int, budget:float) -> list[dict]:
+    """ Generation of all apples and one new apple by _rdmPosApples, with and without set_pos_apple """
+    results = []
+    for width, height in BOARDS:
+        maxradius = (width-2) * (height-4) - 10
+        for set_pos_apple in (False, True):
+            for lots_of_apples in (20, maxradius // 2):
+                config = {'width': width, 'height': height, 'lots_of_apples': lots_of_apples, 'set_pos_apple': set_pos_apple}
+                engine = SnakeEngine(seed=seed, **config)
+                name = f'apples {"free" if set_pos_apple else "random"} {width}x{height} x{lots_of_apples}'
+                results.append(_timed(f'{name} generate', config, engine.reset, ticks, budget))
+                # eat the apples of a new game one by one and generate a new apple each time
+                apples = []
+                times = []
+                start = time.perf_counter()
+                while len(times) < ticks and (len(times) < 5 or time.perf_counter() - start <= budget):
+                    if not apples:
+                        engine.reset()
+                        apples = list(engine._posApples)
+                    pos = apples.pop()
+                    begin = time.perf_counter()
+                    engine._removeApple(pos)
+                    engine._rdmPosApples(generated=False)
+                    times.append(time.perf_counter()-begin)
+                results.append(_summary(f'{name} respawn', config, times, sum(times)))
+    return results
+
+def bench_bots(seed:int, ticks:int, budget:float) -> list[dict]:
+    """ Decision time of every bot_move_type """
+    results = []
+    for bot_move_type, game_over in (('neat', False), ('algorithm', False), ('pathfinding', False), ('pathfinding', True),
+                                     ('mcts', False), ('mcts', True)):
+        for lots_of_apples in (20, 1000):
+            config = {'width': 80, 'height': 24, 'lots_of_apples': lots_of_apples, 'game_over': game_over, 'bot_move_type': bot_move_type}
+            engine = SnakeEngine(seed=seed, **config)
+            times = []
+            start = time.perf_counter()
+            for i in range(ticks):
+                begin = time.perf_counter()
+                action = engine.bot_action()
+                times.append(time.perf_counter()-begin)
+                if engine.step(action)[2]:
+                    engine.reset()
+                if i >= 4 and begin - start > budget:
+                    break
+            name = f'bot {bot_move_type}{" game_over" if game_over else ""} x{lots_of_apples}'
+            results.append(_summary(name, config, times, sum(times)))
+    return results
+
+def bench_collision(seed:int, ticks:int, budget:float) -> list[dict]:
+    """ Ticks of a long snake in game over mode, so every tick checks the self collision """
+    results = []
+    for width, height in BOARDS:
+        maxradius = (width-2) * (height-4) - 10
+        for len_snake in (10, 1000, maxradius):
+            if len_snake > maxradius:
+                continue
+            config = {'width': width, 'height': height + height % 2, 'lots_of_apples': 1, 'len_snake': len_snake,
+                      'generate_new_apple': False, 'game_over': True}
+            engine = SnakeEngine(seed=seed, **config)
+            def tick():
+                if engine.step(_cycleAction(engine))[2]:
+                    engine.reset()
+            # first the snake grows to its full length
+            for _ in range(len_snake):
+                tick()
+            results.append(_timed(f'collision {width}x{config["height"]} len:{len_snake}', config, tick, ticks, budget))
+    return results
+
+def bench_arena(seed:int, ticks:int, budget:float) -> list[dict]:
+    """ Ticks of the SnakeArena bots on the largest board with more and more snakes """
+    results = []
+    width, height = BOARDS[-1]
+    for snakes in (50, 200, 800):
+        config = {'width': width, 'height': height, 'lots_of_apples': 500, 'snakes': snakes}
+        arena = SnakeArena(seed=seed, **config)
+        results.append(_timed(f'arena {width}x{height} snakes:{snakes}', config, arena.step, ticks, budget))
+    return results
+
+BENCHMARKS = {'render': bench_render, 'apples': bench_apples, 'bots': bench_bots, 'collision': bench_collision, 'arena': bench_arena}
+
+def run(names:tuple[str]=tuple(BENCHMARKS), seed:int=0, ticks:int=2000, budget:float=2.0) -> dict:
+    """ Runs the benchmarks and returns the results with the environment they were made in """
+    results = []
+    for name in names:
+        if name not in BENCHMARKS:
+            raise TypeError(f"No benchmark with type '{name}'!")
+        results.extend(BENCHMARKS[name](seed, ticks, budget))
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'seed': seed, 'ticks': ticks,
+            'budget': budget, 'results': results}
+
+def compare(results:dict, baseline:dict, tolerance:float=0.15) -> list[tuple[str, float, float, bool]]:
+    """ Compares the median tick time with the baseline, returns (name, baseline, result, regression) of every benchmark in both """
+    base = {result['name']: result for result in baseline['results'] if 'p50_ms' in result}
+    compared = []
+    for result in results['results']:
+        if result['name'] in base and 'p50_ms' in result:
+            old, new = base[result['name']]['p50_ms'], result['p50_ms']
+            compared.append((result['name'], old, new, new > old * (1+tolerance)))
+    return compared
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the WinSnake engine and frontend without a terminal and keyboard.')
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS), help=f'benchmarks to run: {", ".join(BENCHMARKS)} (default: all)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generators (default: 0)')
+    parser.add_argument('--ticks', type=int, default=2000, help='maximum ticks of each benchmark (default: 2000)')
+    parser.add_argument('--budget', type=float, default=2.0, help='maximum seconds of each benchmark (default: 2.0)')
+    parser.add_argument('--quick', action='store_true', help='shorter run, the same as --ticks 200 --budget 0.2')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='slowdown against the baseline that is a regression (default: 0.15)')
+    args = parser.parse_args()
+    if args.quick:
+        args.ticks, args.budget = 200, 0.2
+
+    results = run(args.benchmarks, seed=args.seed, ticks=args.ticks, budget=args.budget)
+    for result in results['results']:
+        if 'skipped' in result:
+            print(f"{result['name']:<45} skipped: {result['skipped']}")
+        else:
+            print(f"{result['name']:<45} {result['ticks_per_sec']:>12.1f} ticks/s  p50 {result['p50_ms']:.3f}  p95 {result['p95_ms']:.3f}  p99 {result['p99_ms']:.3f} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as file:
+            json.dump(results, file, indent=1)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf8') as file:
+            compared = compare(results, json.load(file), args.tolerance)
+        print(f'\nBaseline: {args.baseline}')
+        for name, old, new, regression in compared:
+            print(f"{name:<45} p50 {old:>9.4f} -> {new:>9.4f} ms  {(new/old-1)*100 if old else 0.0:+6.1f}%{'  REGRESSION' if regression else ''}")
+        if any(regression for *_, regression in compared):
+            sys.exit(1)
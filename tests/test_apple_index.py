@@ -0,0 +1,54 @@
+import random, unittest
+
+from WinSnake import AppleIndex, SnakeEngine
+
+class AppleIndexTest(unittest.TestCase):
+    """ The bucket search finds the same apples as comparing every apple """
+
+    def brute_force(self, apples:set, pos:tuple[int], k:int, width:int, rows:int, wrap:bool) -> list[tuple[int]]:
+        def distance(apple):
+            dx, dy = abs(apple[0] - pos[0]), abs(apple[1] - pos[1])
+            if wrap:
+                dx, dy = min(dx, width-dx), min(dy, rows-dy)
+            return dx + dy, apple
+        return [apple for _, apple in sorted(map(distance, apples))[:k]]
+
+    def test_k_nearest(self):
+        rdm = random.Random(1)
+        for _ in range(300):
+            width, rows, wrap = rdm.randint(1, 90), rdm.randint(1, 60), rdm.random() < 0.5
+            index, apples = AppleIndex(width, rows, wrap, bucket=rdm.randint(1, 20)), set()
+            for _ in range(rdm.choice((5, 40, 400))):
+                apple = (rdm.randrange(width), rdm.randrange(rows))
+                index.add(apple)
+                apples.add(apple)
+            for _ in range(rdm.randint(0, 50)):
+                apple = (rdm.randrange(width), rdm.randrange(rows))
+                index.remove(apple)
+                apples.discard(apple)
+            self.assertEqual(len(index), len(apples))
+            for _ in range(10):
+                pos, k = (rdm.randrange(width), rdm.randrange(rows)), rdm.choice((1, 3, 10))
+                self.assertEqual(index.k_nearest(pos, k), self.brute_force(apples, pos, k, width, rows, wrap))
+                self.assertEqual(index.nearest(pos), (self.brute_force(apples, pos, 1, width, rows, wrap) or [None])[0])
+
+    def test_empty(self):
+        index = AppleIndex(80, 22, wrap=True)
+        self.assertIsNone(index.nearest((3, 4)))
+        index.add((10, 5))
+        index.clear()
+        self.assertEqual(index.k_nearest((3, 4), 3), [])
+
+    def test_engine(self):
+        # the index of the engine follows the apples through the game and undo()
+        for config in (dict(game_over=False), dict(game_over=True, set_pos_apple=True)):
+            engine = SnakeEngine(width=60, height=20, lots_of_apples=200, bot_move_type='mcts', bot_time_limit=0.001, seed=4, **config)
+            for _ in range(300):
+                if engine.step(engine.bot_action())[2]:
+                    engine.reset()
+                self.assertEqual(engine._appleIndex._apples, set(engine._posApples))
+            self.assertEqual(engine.nearest_apples(5), self.brute_force(set(engine._posApples), (engine._posX_snake, engine._posY_snake), 5,
+                                                                         60, 18, not config['game_over']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import random, unittest
+
+from WinSnake import SnakeBatch, SnakeEngine, np
+
+@unittest.skipIf(np is None, 'SnakeBatch requires numpy')
+class SnakeBatchTest(unittest.TestCase):
+    """ SnakeBatch plays the same games as SnakeEngine """
+
+    def check(self, boards:int=8, ticks:int=1500, **config) -> None:
+        batch = SnakeBatch(boards, seed=100, **config)
+        engines = [SnakeEngine(seed=100+i, **config) for i in range(boards)]
+        rdm = random.Random(5)
+        for tick in range(ticks):
+            actions = [rdm.choice((-1, -1, -1, 0, 1, 2, 3, 4)) for _ in range(boards)]
+            state, reward, done = batch.step(actions)
+            for i, engine in enumerate(engines):
+                if engine._game_over:
+                    engine.reset()
+                expected = engine.step(None if actions[i] < 0 else SnakeBatch.ACTIONS[actions[i]])
+                got = (state._replace(head=tuple(state.head[i]), move=SnakeBatch.ACTIONS[state.move[i]], length=state.length[i],
+                                      score=state.score[i], apples=state.apples[i], tick=state.tick[i]), reward[i], done[i])
+                self.assertEqual(got, expected, f'board {i} on tick {tick+1}')
+
+    def test_game_over(self):
+        self.check(width=50, height=15, lots_of_apples=60, len_snake=3, game_over=True)
+
+    def test_wrap(self):
+        self.check(width=50, height=15, lots_of_apples=60, game_over=False)
+
+    def test_set_pos_apple(self):
+        self.check(width=50, height=15, lots_of_apples=60, len_snake=3, game_over=True, set_pos_apple=True)
+
+if __name__ == '__main__':
+    unittest.main()
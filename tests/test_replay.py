@@ -0,0 +1,53 @@
+import os, random, tempfile, unittest
+
+from WinSnake import Replay, SnakeEngine
+
+class ReplayTest(unittest.TestCase):
+    """ A saved replay goes back to the recorded game """
+
+    def record(self, ticks:int, **config) -> tuple[Replay, list]:
+        # plays random moves like a player, continues after every game over and returns the states after every tick
+        engine = SnakeEngine(seed=7, **config)
+        replay = Replay(dict(config, seed=7))
+        rdm = random.Random(3)
+        states = []
+        for tick in range(ticks):
+            action = rdm.choice((None, None, None, None, 'w', 'a', 's', 'd', ''))
+            state, _, done = engine.step(action)
+            replay.action(action)
+            states.append(state)
+            if tick % 500 == 250:
+                replay.event('pause')
+                replay.event('continue')
+            if done:
+                replay.event('reset')
+                engine.reset()
+        return replay, states
+
+    def reload(self, replay:Replay) -> Replay:
+        # saves the replay to a file and reads it again
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.wsr')
+            replay.save(path)
+            return Replay.load(path)
+
+    def check(self, **config) -> None:
+        replay, states = self.record(3000, **config)
+        replay = self.reload(replay)
+        self.assertEqual(replay.ticks, len(states))
+        for tick in (1, 2, 250, 251, 999, 1000, 2345, len(states)):
+            self.assertEqual(replay.seek(tick).state(), states[tick-1], f'tick {tick}')
+        self.assertEqual([engine.state() for _, engine in replay.frames()], states)
+
+    def test_game_over(self):
+        self.check(width=50, height=15, lots_of_apples=40, len_snake=3, game_over=True)
+
+    def test_wrap(self):
+        self.check(width=60, height=20, lots_of_apples=40, game_over=False, set_pos_apple=True)
+
+    def test_events(self):
+        replay, _ = self.record(600, width=50, height=15, game_over=False)
+        self.assertEqual(self.reload(replay).events(), [(251, 'pause'), (251, 'continue')])
+
+if __name__ == '__main__':
+    unittest.main()
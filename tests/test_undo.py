@@ -0,0 +1,67 @@
+import random, unittest
+
+from WinSnake import SnakeEngine
+
+def full_state(engine:SnakeEngine) -> tuple:
+    """ Everything undo() has to restore: the snake, the board, the apples, the free cell index and the random generator """
+    return (engine.state(), engine._deltaX, engine._deltaY, engine._game_over, engine._gameOverMessage, engine._rmCountApple,
+            list(engine._snakeList), bytes(engine._snakeGrid), dict(engine._posApples), sorted(engine._appleIndex._apples),
+            list(engine._freeCells), list(engine._freePos), engine._random.getstate())
+
+class UndoTest(unittest.TestCase):
+    """ snapshot() and undo() go back to the exact earlier game """
+
+    def check(self, **config) -> None:
+        engine = SnakeEngine(width=50, height=15, seed=3, **config)
+        rdm = random.Random(5)
+        for _ in range(4000):
+            if rdm.random() < 0.05:
+                before = full_state(engine)
+                snapshot = engine.snapshot()
+                steps = [(action, engine.step(action)) for action in rdm.choices(('w', 'a', 's', 'd', '', None), k=rdm.randrange(1, 30))]
+                after = full_state(engine)
+                engine.undo(snapshot)
+                self.assertEqual(full_state(engine), before)
+                # the same moves play the same game again, the random generator was restored too
+                for action, result in steps:
+                    self.assertEqual(engine.step(action), result)
+                self.assertEqual(full_state(engine), after)
+                engine.release()
+            if engine.step(rdm.choice(('w', 'a', 's', 'd', None)))[2]:
+                engine.reset()
+
+    def test_wrap(self):
+        self.check(game_over=False)
+
+    def test_game_over(self):
+        self.check(game_over=True, lots_of_apples=400, len_snake=5)
+
+    def test_set_pos_apple(self):
+        self.check(game_over=True, set_pos_apple=True)
+        self.check(game_over=False, set_pos_apple=True, lots_of_apples=300)
+
+    def test_nested(self):
+        engine = SnakeEngine(seed=1, game_over=False)
+        first = full_state(engine)
+        outer = engine.snapshot()
+        engine.step('d')
+        second = full_state(engine)
+        inner = engine.snapshot()
+        engine.step('s')
+        engine.undo(inner)
+        self.assertEqual(full_state(engine), second)
+        engine.undo(outer)
+        self.assertEqual(full_state(engine), first)
+
+    def test_random_state(self):
+        # without random_state the random generator keeps going
+        engine = SnakeEngine(width=50, height=15, seed=2, game_over=False, lots_of_apples=1, bot_move_type='algorithm')
+        snapshot = engine.snapshot(random_state=False)
+        while engine.state().score == 0:
+            engine.step(engine.bot_action())
+        random_state = engine._random.getstate()
+        engine.undo(snapshot)
+        self.assertEqual(engine._random.getstate(), random_state)
+
+if __name__ == '__main__':
+    unittest.main()
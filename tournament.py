@@ -0,0 +1,122 @@
+"""
+Copyright (C) 2024
+pywinsnake - WinSnake bot tournament
+
+github: AzzamMuhyala - https://github.com/azzammuhyala
+"""
+import os, sys, time, math, json, itertools, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from WinSnake import SnakeEngine
+
+def _percentile(values:list, percent:int) -> float:
+    # returns the percentile of the sorted values, None if there are no values
+    return values[max(0, math.ceil(percent/100*len(values))-1)] if values else None
+
+def play_game(config:dict, seed:int, max_ticks:int=5000, goals:tuple[int]=(10, 50)) -> dict:
+    """ Plays one game of the bot without terminal and sleeping and returns its result """
+    engine = SnakeEngine(seed=seed, **config)
+    goals = sorted(goals)
+    reached = {} # the tick of every apple goal the bot reached
+    times = [] # seconds of every bot decision
+    done = False
+    start = time.perf_counter()
+    while not done and engine._tick < max_ticks:
+        begin = time.perf_counter()
+        action = engine.bot_action()
+        times.append(time.perf_counter()-begin)
+        state, _, done = engine.step(action)
+        for goal in goals:
+            if goal not in reached and state.score >= goal:
+                reached[goal] = state.tick
+    times.sort()
+    return {'config': config, 'seed': seed, 'score': engine.state().score, 'ticks': engine._tick, 'survived': not done,
+            'game_over': engine._gameOverMessage, 'goals': {str(goal): reached.get(goal) for goal in goals},
+            'decision_ms': {'mean': sum(times)/len(times)*1000 if times else 0.0, 'p50': (_percentile(times, 50) or 0.0)*1000,
+                            'p95': (_percentile(times, 95) or 0.0)*1000, 'max': (times[-1] if times else 0.0)*1000},
+            'seconds': time.perf_counter()-start}
+
+def grid(bots:list[str], sizes:list[tuple[int]], apples:list[int], new_apple:list[bool], game_over:list[bool], len_snake:list[int]) -> list[dict]:
+    """ Returns the SnakeEngine configuration of every combination of the values """
+    return [{'width': width, 'height': height, 'lots_of_apples': loa, 'generate_new_apple': gna, 'game_over': go,
+             'len_snake': ls, 'bot_move_type': bmt}
+            for bmt, (width, height), loa, gna, go, ls in itertools.product(bots, sizes, apples, new_apple, game_over, len_snake)]
+
+def tournament(configs:list[dict], seeds:int=8, max_ticks:int=5000, goals:tuple[int]=(10, 50), workers:None|int=None):
+    """ Plays `seeds` games of every configuration in worker processes and yields the results as soon as they finish """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, config, seed, max_ticks, goals) for config in configs for seed in range(seeds)]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def aggregate(results:list[dict]) -> list[dict]:
+    """ Returns the statistics of the games of every configuration """
+    groups = {}
+    for result in results:
+        groups.setdefault(json.dumps(result['config'], sort_keys=True), []).append(result)
+    stats = []
+    for games in groups.values():
+        scores = sorted(game['score'] for game in games)
+        decisions = sorted(game['decision_ms']['p95'] for game in games) # the decision p95 is the median of the games
+        stat = {'config': games[0]['config'], 'games': len(games),
+                'score': {'mean': sum(scores)/len(scores), 'p50': _percentile(scores, 50), 'p95': _percentile(scores, 95),
+                          'min': scores[0], 'max': scores[-1]},
+                'survival': sum(game['survived'] for game in games)/len(games),
+                'ticks': {'mean': sum(game['ticks'] for game in games)/len(games)},
+                'goals': {},
+                'decision_ms': {'mean': sum(game['decision_ms']['mean'] for game in games)/len(games),
+                                'p95': _percentile(decisions, 50), 'max': max(game['decision_ms']['max'] for game in games)}}
+        for goal in games[0]['goals']:
+            ticks = sorted(game['goals'][goal] for game in games if game['goals'][goal] is not None)
+            stat['goals'][goal] = {'reached': len(ticks)/len(games), 'p50': _percentile(ticks, 50), 'p95': _percentile(ticks, 95)}
+        stats.append(stat)
+    return stats
+
+if __name__ == '__main__':
+    size = lambda text: tuple(int(value) for value in text.lower().split('x'))
+    parser = argparse.ArgumentParser(description='Plays seeded games of the WinSnake bots in parallel processes and compares them.')
+    parser.add_argument('--bots', nargs='+', default=['neat', 'algorithm', 'pathfinding', 'mcts'], help='bot_move_type of the bots (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=size, default=[(80, 24)], help='board sizes WIDTHxHEIGHT (default: 80x24)')
+    parser.add_argument('--apples', nargs='+', type=int, default=[20], help='lots_of_apples values (default: 20)')
+    parser.add_argument('--new-apple', nargs='+', type=int, default=[1], help='generate_new_apple values 0 or 1 (default: 1)')
+    parser.add_argument('--game-over', nargs='+', type=int, default=[0], help='game_over values 0 or 1 (default: 0)')
+    parser.add_argument('--len-snake', nargs='+', type=int, default=[1], help='len_snake values (default: 1)')
+    parser.add_argument('--seeds', type=int, default=8, help='games of every configuration, seeded 0 to SEEDS-1 (default: 8)')
+    parser.add_argument('--max-ticks', type=int, default=5000, help='ticks after which a game stops (default: 5000)')
+    parser.add_argument('--goals', nargs='+', type=int, default=[10, 50], help='scores to count the ticks to (default: 10 50)')
+    parser.add_argument('--workers', type=int, default=None, help=f'worker processes (default: {os.cpu_count()})')
+    parser.add_argument('--output', help='write the games and the statistics to this JSON file')
+    parser.add_argument('--quiet', action='store_true', help="don't print every game when it finishes")
+    args = parser.parse_args()
+
+    configs = grid(args.bots, args.sizes, args.apples, [bool(value) for value in args.new_apple],
+                   [bool(value) for value in args.game_over], args.len_snake)
+    results = []
+    start = time.perf_counter()
+    try:
+        for result in tournament(configs, args.seeds, args.max_ticks, tuple(args.goals), args.workers):
+            results.append(result)
+            if not args.quiet:
+                config = result['config']
+                print(f"[{len(results)}/{len(configs)*args.seeds}] {config['bot_move_type']:<12} {config['width']}x{config['height']} "
+                      f"seed:{result['seed']:<3} score:{result['score']:<5} ticks:{result['ticks']:<6} {result['game_over'] or 'ALIVE'}", flush=True)
+    except KeyboardInterrupt:
+        print('Stopped, the statistics are made of the finished games.')
+    seconds = time.perf_counter()-start
+    stats = aggregate(results)
+    print(f"\n{len(results)} games, {sum(result['ticks'] for result in results)/seconds:.0f} ticks/s in {seconds:.1f} seconds")
+    for stat in stats:
+        config = stat['config']
+        goals = '  '.join(f"to {goal}: {goal_stat['p50'] or '-'} ({goal_stat['reached']:.0%})" for goal, goal_stat in stat['goals'].items())
+        print(f"{config['bot_move_type']:<12} {config['width']}x{config['height']} apples:{config['lots_of_apples']} "
+              f"new_apple:{int(config['generate_new_apple'])} game_over:{int(config['game_over'])} snake:{config['len_snake']}\n"
+              f"    score mean {stat['score']['mean']:.1f} p50 {stat['score']['p50']} max {stat['score']['max']}  "
+              f"survival {stat['survival']:.0%}  {goals}  decision p95 {stat['decision_ms']['p95']:.3f} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as file:
+            json.dump({'games': results, 'stats': stats}, file, indent=1)
+    if not results:
+        sys.exit(1)
@@ -0,0 +1,67 @@
+"""
+Copyright (C) 2024
+pywinsnake - WinSnake spectator viewer
+
+github: AzzamMuhyala - https://github.com/azzammuhyala
+"""
+import os, sys, json, socket, argparse
+
+CHARS = [' ', '\033[38;2;0;200;0m#\033[0m', '\033[38;2;0;200;255m$\033[0m', '\033[38;2;200;0;0m@\033[0m'] # characters of the cell types
+SIZE = [0, 0] # width and rows of the board from the last keyframe
+
+def connect(address:str) -> socket.socket:
+    """ Connects to the spectator server, `address` is a port on localhost or the path of a Unix socket """
+    if address.isdigit():
+        return socket.create_connection(('127.0.0.1', int(address)))
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(address)
+    return client
+
+def empty(col:int, row:int) -> str:
+    """ Returns the character of an empty cell, the border on the edges of the board """
+    width, rows = SIZE
+    top, bottom = row == 0, row == rows-1
+    if col == 0:
+        return '┏' if top else '┗' if bottom else '┃'
+    if col == width-1:
+        return '┓' if top else '┛' if bottom else '┃'
+    return '━' if top or bottom else ' '
+
+def draw(message:dict) -> str:
+    """ Returns the ANSI text that draws the message of the server on the screen """
+    out = []
+    if 'k' in message:
+        # keyframe: the empty board with the border, then the cells
+        width, rows = message['k']
+        SIZE[:] = width, rows
+        out.append('\033[?25l\033[2J\033[2;1H')
+        out.append('┏' + '━'*(width-2) + '┓\n')
+        out.append(('┃' + ' '*(width-2) + '┃\n') * (rows-2))
+        out.append('┗' + '━'*(width-2) + '┛')
+    for col, row, kind in message['c']:
+        out.append(f'\033[{row+2};{col+1}H{CHARS[kind] if kind else empty(col, row)}')
+    score, hiscore, apples, left = message['s']
+    out.append(f'\033[1;1HTICK: {message["t"]}  SCORE: {score}/{hiscore}  APPLES: {apples}/{left}'
+               + (f'  \033[31mGAME OVER\033[0m - \033[33m{message["o"]}\033[0m' if 'o' in message else '') + '\033[K')
+    return ''.join(out)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Watches a WinSnake game that is played with spectator_address.')
+    parser.add_argument('address', help='port of the spectator server on localhost or the path of its Unix socket')
+    args = parser.parse_args()
+    try:
+        client = connect(args.address)
+    except OSError as e:
+        print(f'Can\'t connect to the spectator server {args.address}: {e}')
+        sys.exit(1)
+    try:
+        for line in client.makefile('r', encoding='utf8'):
+            sys.stdout.write(draw(json.loads(line)))
+            sys.stdout.flush()
+        message = 'The game ended.'
+    except KeyboardInterrupt:
+        message = 'You stopped watching.'
+    finally:
+        client.close()
+    rows = os.get_terminal_size().lines if sys.stdout.isatty() else 1
+    print(f'\033[{rows};1H\033[?25h\n{message}')